@@ -1,23 +1,103 @@
 from datetime import datetime, timedelta, timezone
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional
+from cache import ExpiringLRUCache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+import asyncio
+import hashlib
 import os
+import time
 
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "sge-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
+# Token que só lê fotos: vai na URL das imagens (<img src> não envia headers) no
+# lugar do token da sessão, que assim não aparece em logs de acesso e histórico
+MEDIA_SCOPE = "media"
+# "jose" (padrão) ou "pyjwt"
+JWT_BACKEND = os.environ.get("JWT_BACKEND", "jose").lower()
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", 1024))
+# Quantos hashes bcrypt rodam ao mesmo tempo; os demais esperam na fila do pool
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Payloads de tokens já verificados, por hash do token, até o `exp` de cada um
+token_cache = ExpiringLRUCache(max_size=TOKEN_CACHE_SIZE)
+
+_pwd_context = None
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+_password_pool: Optional[ThreadPoolExecutor] = None
+password_stats = {"calls": 0, "queued": 0, "queue_seconds_total": 0.0, "queue_seconds_max": 0.0, "run_seconds_total": 0.0}
+
+def _get_pwd_context():
+    # passlib/bcrypt só são carregados no primeiro login ou cadastro
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _get_pwd_context().hash(password)
+
+def _get_password_pool() -> ThreadPoolExecutor:
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _password_pool
+
+async def _run_password_job(func: Callable, *args):
+    # O bcrypt libera o GIL, então as threads do pool não travam o event loop.
+    # A thread só anota os próprios horários; password_stats é atualizado
+    # aqui, no event loop, para que threads simultâneas não percam somas.
+    submitted = time.perf_counter()
+    timing = {}
+    password_stats["queued"] += 1
+
+    def job():
+        timing["started"] = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            timing["finished"] = time.perf_counter()
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_password_pool(), job)
+    finally:
+        password_stats["queued"] -= 1
+        password_stats["calls"] += 1
+        # Sem "finished" se a requisição foi cancelada antes de o job terminar
+        if "finished" in timing:
+            waited = timing["started"] - submitted
+            password_stats["queue_seconds_total"] += waited
+            password_stats["queue_seconds_max"] = max(password_stats["queue_seconds_max"], waited)
+            password_stats["run_seconds_total"] += timing["finished"] - timing["started"]
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_password_job(get_password_hash, password)
+
+def get_password_pool_stats() -> Dict[str, float]:
+    calls = password_stats["calls"]
+    return {
+        **password_stats,
+        "workers": PASSWORD_HASH_WORKERS,
+        "queue_seconds_avg": password_stats["queue_seconds_total"] / calls if calls else 0.0,
+    }
+
+def shutdown_password_pool():
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False, cancel_futures=True)
+        _password_pool = None
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -26,31 +106,96 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    return _encode(to_encode)
+
+def _encode(to_encode: dict) -> str:
+    if JWT_BACKEND == "pyjwt":
+        import jwt as pyjwt
+
+        return pyjwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    from jose import jwt
+
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def _decode_jose(token: str) -> Optional[dict]:
+    from jose import JWTError, jwt
 
-def decode_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
+        return None
+
+def _decode_pyjwt(token: str) -> Optional[dict]:
+    import jwt as pyjwt
+
+    try:
+        return pyjwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except pyjwt.PyJWTError:
+        return None
+
+_decode = _decode_pyjwt if JWT_BACKEND == "pyjwt" else _decode_jose
+
+def create_media_token(session: dict) -> str:
+    """
+    Token de mídia da sessão `session` (payload do token da sessão). Vale até a
+    sessão expirar e não tem iat, então é sempre o mesmo para a mesma sessão: a
+    URL das fotos não muda e o cache do navegador (immutable) é aproveitado.
+    """
+    return _encode({"sub": session["sub"], "scope": MEDIA_SCOPE, "exp": session["exp"]})
+
+def decode_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = _decode(token)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if "exp" in payload:
+        token_cache.set(key, payload, float(payload["exp"]))
+    return payload
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     token = credentials.credentials
     payload = decode_token(token)
     user_id: str = payload.get("sub")
-    if user_id is None:
+    # Tokens de mídia não valem como sessão
+    if user_id is None or payload.get("scope") == MEDIA_SCOPE:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Não foi possível validar as credenciais",
         )
     return payload
 
+async def get_current_user_for_media(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> dict:
+    """
+    Aceita o token da sessão no header ou, via query string (?token=...), um
+    token de mídia (create_media_token), pois <img src> não envia headers
+    """
+    if credentials:
+        return await get_current_user(credentials)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não autenticado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    payload = decode_token(token)
+    if payload.get("sub") is None or payload.get("scope") != MEDIA_SCOPE:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de mídia inválido",
+        )
+    return payload
+
 async def get_current_admin_user(current_user: dict = Depends(get_current_user)) -> dict:
     if current_user.get("role") != "admin":
         raise HTTPException(
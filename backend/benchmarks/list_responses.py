@@ -0,0 +1,91 @@
+"""
+Compara GET /api/students com a serialização pelo Pydantic e com o caminho
+rápido (FAST_LIST_RESPONSES: projeção nos campos do modelo + orjson), para
+1.000 e 10.000 alunos, percorrendo todas as páginas de uma turma de teste.
+
+Uso (a partir de backend/, com MONGO_URL e DB_NAME apontando para o banco de teste):
+    python benchmarks/list_responses.py --sizes 1000 10000 --repeat 5
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+import fast_response
+from server import app
+from database import db
+from auth import create_access_token
+from pagination import MAX_PAGE_SIZE
+
+def make_students(turma_id: str, total: int) -> list:
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Aluno {index:06d}",
+            "name_tokens": ["aluno", f"{index:06d}"],
+            "email": f"aluno{index}@escola.com.br",
+            "phone": "(11) 99999-0000",
+            "birth_date": "2005-01-01",
+            "photo_id": None,
+            "turma_id": turma_id,
+            "turma_name": "Benchmark",
+            "course_name": "Benchmark",
+            "status": "active",
+            "created_at": base + timedelta(seconds=index),
+        }
+        for index in range(total)
+    ]
+
+async def walk_pages(client: httpx.AsyncClient, turma_id: str) -> int:
+    rows, cursor = 0, None
+    while True:
+        params = {"turma_id": turma_id, "limit": MAX_PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/api/students", params=params)
+        response.raise_for_status()
+        page = response.json()
+        rows += len(page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return rows
+
+async def measure(client: httpx.AsyncClient, turma_id: str, fast: bool, repeat: int) -> list:
+    fast_response.FAST_LIST_RESPONSES = fast
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await walk_pages(client, turma_id)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+async def main(sizes: list, repeat: int):
+    if fast_response.orjson is None:
+        sys.exit("orjson não instalado")
+
+    token = create_access_token({"sub": "benchmark", "email": "benchmark@sge.local", "role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers) as client:
+        for size in sizes:
+            turma_id = f"benchmark-{uuid.uuid4()}"
+            await db.students.insert_many(make_students(turma_id, size))
+            try:
+                await measure(client, turma_id, True, 1)
+                for label, fast in (("pydantic", False), ("orjson", True)):
+                    timings = await measure(client, turma_id, fast, repeat)
+                    print(f"{size:>6} alunos  {label:<9} mediana={statistics.median(timings):8.1f} ms  min={min(timings):8.1f} ms")
+            finally:
+                await db.students.delete_many({"turma_id": turma_id})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeat))
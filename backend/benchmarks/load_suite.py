@@ -0,0 +1,328 @@
+"""
+Teste de carga reprodutível: cria N alunos de teste, dispara tráfego concorrente
+com a mistura de uso do sistema (login, dashboard, listagem, busca, edição e
+fotos) e grava vazão e p50/p95/p99 por endpoint em JSON.
+
+Com a mesma semente, quantidade de alunos, concorrência e duração, os resultados
+de commits diferentes são comparáveis; --baseline aponta regressões.
+
+Uso (a partir de backend/, com MONGO_URL e DB_NAME apontando para um banco de teste,
+ou DB_BACKEND=sqlite):
+    python benchmarks/load_suite.py --students 10000 --concurrency 20 --duration 30 --output atual.json
+    python benchmarks/load_suite.py --students 10000 --baseline anterior.json
+    python benchmarks/load_suite.py --url http://localhost:8001 --students 1000
+
+Sem --url o app roda no próprio processo (ASGI); com --url o backend já precisa
+estar no ar usando o mesmo banco.
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from PIL import Image
+from server import app
+from database import db, DB_BACKEND
+from auth import get_password_hash
+from photo_store import save_photo, release_photo
+from thumbnails import PHOTO_SIZES
+from stats import record_students_added, rebuild_stats
+from text_search import name_tokens
+from seed_bulk import FIRST_NAMES, LAST_NAMES
+
+BENCH_EMAIL = "benchmark-load@escola.com.br"
+BENCH_PASSWORD = "benchmark-password"
+BENCH_PREFIX = "benchmark-"
+SEED_BATCH_SIZE = 1000
+PHOTO_COUNT = 20
+
+# Peso de cada operação na mistura de tráfego
+TRAFFIC_MIX = {
+    "login": 2,
+    "dashboard": 10,
+    "list": 28,
+    "search": 20,
+    "get": 10,
+    "edit": 15,
+    "photo": 15,
+}
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def commit_id() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+def photo_bytes(index: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (320, 400), ((index * 53) % 256, (index * 97) % 256, (index * 151) % 256)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+async def seed(total: int, rng: random.Random) -> dict:
+    """
+    Cria curso, turmas, usuário e alunos de teste (ids com BENCH_PREFIX)
+    """
+    course_id = f"{BENCH_PREFIX}{uuid.uuid4()}"
+    now = datetime.now(timezone.utc)
+    await db.courses.insert_one({
+        "id": course_id, "name": f"{BENCH_PREFIX}curso", "workload": 3000,
+        "description": None, "active": True, "created_at": now,
+    })
+    turmas = [
+        {
+            "id": f"{BENCH_PREFIX}{uuid.uuid4()}", "name": f"Turma {index + 1:02d}", "course_id": course_id,
+            "course_name": f"{BENCH_PREFIX}curso", "period": "Noturno", "year": 2025, "active": True, "created_at": now,
+        }
+        for index in range(max(1, total // 40))
+    ]
+    await db.turmas.insert_many(turmas)
+
+    await db.users.delete_many({"email": BENCH_EMAIL})
+    await db.users.insert_one({
+        "id": f"{BENCH_PREFIX}{uuid.uuid4()}", "email": BENCH_EMAIL, "password": get_password_hash(BENCH_PASSWORD),
+        "name": "Benchmark", "role": "admin", "active": True, "created_at": now,
+    })
+
+    photo_ids = [await save_photo(photo_bytes(index), "image/jpeg") for index in range(PHOTO_COUNT)]
+
+    student_ids, with_photo, batch = [], [], []
+    for index in range(total):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+        turma = turmas[index % len(turmas)]
+        student = {
+            "id": f"{BENCH_PREFIX}{uuid.UUID(int=rng.getrandbits(128))}",
+            "name": name,
+            "name_tokens": name_tokens(name),
+            "email": None,
+            "phone": None,
+            "birth_date": None,
+            "photo_id": photo_ids[index % PHOTO_COUNT] if index % 3 == 0 else None,
+            "turma_id": turma["id"],
+            "turma_name": turma["name"],
+            "course_name": turma["course_name"],
+            "status": "active" if index % 10 else "inactive",
+            "created_at": now - timedelta(minutes=index),
+        }
+        student_ids.append(student["id"])
+        if student["photo_id"]:
+            with_photo.append(student["id"])
+        batch.append(student)
+        if len(batch) >= SEED_BATCH_SIZE:
+            await db.students.insert_many(batch, ordered=False)
+            await record_students_added(batch)
+            batch = []
+    if batch:
+        await db.students.insert_many(batch, ordered=False)
+        await record_students_added(batch)
+
+    return {
+        "course_id": course_id,
+        "turma_ids": [turma["id"] for turma in turmas],
+        "student_ids": student_ids,
+        "with_photo": with_photo,
+        "photo_ids": photo_ids,
+    }
+
+async def cleanup(data: dict):
+    await db.students.delete_many({"turma_id": {"$in": data["turma_ids"]}})
+    await db.turmas.delete_many({"id": {"$in": data["turma_ids"]}})
+    await db.courses.delete_one({"id": data["course_id"]})
+    await db.users.delete_many({"email": BENCH_EMAIL})
+    for photo_id in data["photo_ids"]:
+        await release_photo(photo_id)
+    await rebuild_stats()
+
+def operations(data: dict):
+    search_terms = sorted({name[:3] for name in FIRST_NAMES + LAST_NAMES})
+
+    async def login(client, rng):
+        return await client.post("/api/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+
+    async def dashboard(client, rng):
+        return await client.get("/api/dashboard/metrics")
+
+    async def list_students(client, rng):
+        params = {"limit": 50, "turma_id": rng.choice(data["turma_ids"])}
+        if rng.random() < 0.3:
+            params = {"limit": 100, "sort": rng.choice(["name", "created_at", "status"]), "with_total": "true"}
+        return await client.get("/api/students", params=params)
+
+    async def search(client, rng):
+        return await client.get("/api/students", params={"q": rng.choice(search_terms), "limit": 20})
+
+    async def get_student(client, rng):
+        return await client.get(f"/api/students/{rng.choice(data['student_ids'])}")
+
+    async def edit(client, rng):
+        phone = f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+        return await client.put(f"/api/students/{rng.choice(data['student_ids'])}", json={"phone": phone})
+
+    async def photo(client, rng):
+        size = rng.choice(PHOTO_SIZES + (None,))
+        params = {"size": size} if size else {}
+        return await client.get(f"/api/students/{rng.choice(data['with_photo'])}/photo", params=params)
+
+    return {
+        "login": login,
+        "dashboard": dashboard,
+        "list": list_students,
+        "search": search,
+        "get": get_student,
+        "edit": edit,
+        "photo": photo,
+    }
+
+async def drive(client: httpx.AsyncClient, data: dict, concurrency: int, duration: float, seed_value: int) -> dict:
+    ops = operations(data)
+    names = list(TRAFFIC_MIX)
+    weights = [TRAFFIC_MIX[name] for name in names]
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int):
+        rng = random.Random(seed_value * 1000 + index)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await ops[name](client, rng)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            samples[name].append((time.perf_counter() - started) * 1000)
+            errors[name] += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name in names:
+        latencies = samples[name]
+        if not latencies:
+            continue
+        endpoints[name] = {
+            "requests": len(latencies),
+            "errors": errors[name],
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(max(latencies), 2),
+        }
+    everything = [latency for latencies in samples.values() for latency in latencies]
+    total = {
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "throughput_rps": round(len(everything) / elapsed, 2),
+        "p50_ms": round(percentile(everything, 0.50), 2),
+        "p95_ms": round(percentile(everything, 0.95), 2),
+        "p99_ms": round(percentile(everything, 0.99), 2),
+    }
+    return {"elapsed_seconds": round(elapsed, 2), "endpoints": endpoints, "total": total}
+
+def compare(result: dict, baseline: dict, tolerance: float) -> bool:
+    """
+    Imprime a variação do p95 por endpoint; True se algum piorou além da tolerância
+    """
+    regressed = False
+    for name, current in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous or not previous["p95_ms"]:
+            continue
+        change = current["p95_ms"] / previous["p95_ms"] - 1
+        flag = "REGRESSÃO" if change > tolerance else ""
+        regressed = regressed or bool(flag)
+        print(f"{name:<10} p95 {previous['p95_ms']:8.2f} -> {current['p95_ms']:8.2f} ms ({change:+.0%}) {flag}", file=sys.stderr)
+    return regressed
+
+async def main(args) -> dict:
+    rng = random.Random(args.seed)
+    in_process = not args.url
+    if in_process:
+        # O aviso de "pronto" da inicialização vai para o stderr; o stdout fica só com o JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            await app.router.startup()
+
+    print(f"Criando {args.students} alunos de teste...", file=sys.stderr)
+    seed_started = time.perf_counter()
+    data = await seed(args.students, rng)
+    seed_seconds = time.perf_counter() - seed_started
+
+    transport = httpx.ASGITransport(app=app) if in_process else None
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url=args.url or "http://bench", limits=limits, timeout=60) as client:
+            response = await client.post("/api/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+            response.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+            print(f"Aquecimento ({args.warmup:.0f} s) e medição ({args.duration:.0f} s)...", file=sys.stderr)
+            await drive(client, data, args.concurrency, args.warmup, args.seed + 1)
+            result = await drive(client, data, args.concurrency, args.duration, args.seed)
+    finally:
+        if not args.keep_data:
+            await cleanup(data)
+        if in_process:
+            await app.router.shutdown()
+
+    return {
+        "meta": {
+            "commit": commit_id(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": args.url or "in-process",
+            "db_backend": DB_BACKEND,
+            "students": args.students,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "seed": args.seed,
+            "seed_seconds": round(seed_seconds, 2),
+            "traffic_mix": TRAFFIC_MIX,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        **result,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="backend já em execução (ex.: http://localhost:8001); padrão: no próprio processo")
+    parser.add_argument("--output", help="arquivo JSON para gravar o resultado")
+    parser.add_argument("--baseline", help="resultado JSON anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="piora máxima aceita no p95 (padrão 15%%)")
+    parser.add_argument("--keep-data", action="store_true", help="não apaga os alunos de teste ao final")
+    args = parser.parse_args()
+
+    result = asyncio.run(main(args))
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        sys.exit(1 if compare(result, baseline, args.tolerance) else 0)
@@ -0,0 +1,83 @@
+"""
+Mede a latência de /api/students com e sem uma rajada de logins simultâneos,
+para confirmar que o bcrypt no pool de threads não trava o event loop.
+
+Uso (a partir de backend/, com MONGO_URL e DB_NAME apontando para um banco com alunos):
+    python benchmarks/login_burst.py --logins 40 --requests 300
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from server import app
+from database import db
+from auth import create_access_token, get_password_hash, get_password_pool_stats
+
+BENCH_EMAIL = "benchmark-login@sge.local"
+BENCH_PASSWORD = "benchmark-password"
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def measure_students(client: httpx.AsyncClient, total: int) -> list:
+    latencies = []
+    for _ in range(total):
+        started = time.perf_counter()
+        response = await client.get("/api/students", params={"limit": 50})
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+async def login_burst(client: httpx.AsyncClient, logins: int):
+    credentials = {"email": BENCH_EMAIL, "password": BENCH_PASSWORD}
+    responses = await asyncio.gather(*(client.post("/api/auth/login", json=credentials) for _ in range(logins)))
+    for response in responses:
+        response.raise_for_status()
+
+def report(label: str, latencies: list):
+    print(
+        f"{label:<18} p50={statistics.median(latencies):7.1f} ms  "
+        f"p95={percentile(latencies, 0.95):7.1f} ms  max={max(latencies):7.1f} ms"
+    )
+
+async def main(logins: int, total: int):
+    await db.users.delete_many({"email": BENCH_EMAIL})
+    await db.users.insert_one({
+        "id": str(uuid.uuid4()),
+        "email": BENCH_EMAIL,
+        "password": get_password_hash(BENCH_PASSWORD),
+        "name": "Benchmark",
+        "role": "professor",
+        "active": True,
+        "created_at": "2024-01-01T00:00:00+00:00",
+    })
+
+    token = create_access_token({"sub": "benchmark", "email": BENCH_EMAIL, "role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers) as client:
+            await measure_students(client, 20)
+            report("sem logins", await measure_students(client, total))
+
+            burst = asyncio.create_task(login_burst(client, logins))
+            latencies = await measure_students(client, total)
+            await burst
+            report(f"{logins} logins", latencies)
+            print(f"pool de senhas: {get_password_pool_stats()}")
+    finally:
+        await db.users.delete_many({"email": BENCH_EMAIL})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.requests))
@@ -0,0 +1,74 @@
+"""
+Compara requisições/segundo com o middleware de barra final antigo
+(BaseHTTPMiddleware) e com o middleware ASGI puro, dentro do processo.
+
+Uso (a partir de backend/, com MONGO_URL e DB_NAME apontando para um banco com alunos):
+    python benchmarks/trailing_slash.py --requests 2000 --concurrency 20
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from server import app
+from middleware import RemoveTrailingSlashMiddleware
+from auth import create_access_token
+
+PATHS = ("/api/health/", "/api/students/?limit=50")
+
+class LegacyTrailingSlashMiddleware(BaseHTTPMiddleware):
+    # Implementação anterior, mantida aqui só para comparação
+    async def dispatch(self, request: Request, call_next):
+        url_path = request.url.path
+        if url_path != "/" and url_path.endswith("/"):
+            url_path = url_path.rstrip("/")
+            request._url = request.url.replace(path=url_path)
+            request.scope["path"] = url_path
+        return await call_next(request)
+
+def use_middleware(middleware_class):
+    for index, middleware in enumerate(app.user_middleware):
+        if middleware.cls in (LegacyTrailingSlashMiddleware, RemoveTrailingSlashMiddleware):
+            app.user_middleware[index] = Middleware(middleware_class)
+    # Força o Starlette a remontar a pilha de middlewares na próxima requisição
+    app.middleware_stack = None
+
+async def run(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> float:
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+async def main(total: int, concurrency: int):
+    token = create_access_token({"sub": "benchmark", "email": "benchmark@sge.local", "role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        print(f"{'middleware':<22} {'rota':<28} {'req/s':>10}")
+        for label, middleware_class in (("BaseHTTPMiddleware", LegacyTrailingSlashMiddleware), ("ASGI puro", RemoveTrailingSlashMiddleware)):
+            use_middleware(middleware_class)
+            for path in PATHS:
+                await run(client, path, min(total, 100), concurrency)
+                rate = await run(client, path, total, concurrency)
+                print(f"{label:<22} {path:<28} {rate:>10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,104 @@
+"""
+Compara a latência de edição no padrão antigo (find_one -> update_one -> find_one)
+com find_one_and_update, direto na coleção de alunos, e mede PUT /api/students/{id}.
+
+Uso (a partir de backend/, com MONGO_URL e DB_NAME apontando para o banco de teste):
+    python benchmarks/update_roundtrip.py --edits 500
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from pymongo import ReturnDocument
+from server import app
+from database import db
+from auth import create_access_token
+
+PROJECTION = {"_id": 0, "photo": 0, "name_tokens": 0}
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def report(label: str, latencies: list):
+    print(
+        f"{label:<22} p50={statistics.median(latencies):7.2f} ms  "
+        f"p99={percentile(latencies, 0.99):7.2f} ms  max={max(latencies):7.2f} ms"
+    )
+
+async def three_round_trips(student_id: str, phone: str):
+    # Implementação anterior das rotas de edição, mantida aqui só para comparação
+    existing = await db.students.find_one({"id": student_id}, PROJECTION)
+    assert existing is not None
+    await db.students.update_one({"id": student_id}, {"$set": {"phone": phone}})
+    return await db.students.find_one({"id": student_id}, PROJECTION)
+
+async def one_round_trip(student_id: str, phone: str):
+    return await db.students.find_one_and_update(
+        {"id": student_id}, {"$set": {"phone": phone}}, PROJECTION, return_document=ReturnDocument.AFTER
+    )
+
+async def measure(edit, edits: int) -> list:
+    latencies = []
+    for index in range(edits):
+        started = time.perf_counter()
+        await edit(f"{index:011d}")
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+async def main(edits: int):
+    turma_id = str(uuid.uuid4())
+    student_id = str(uuid.uuid4())
+    await db.turmas.insert_one({
+        "id": turma_id,
+        "name": "Benchmark",
+        "course_id": "benchmark",
+        "course_name": "Benchmark",
+        "period": "Manhã",
+        "year": 2024,
+        "active": True,
+        "created_at": "2024-01-01T00:00:00+00:00",
+    })
+    await db.students.insert_one({
+        "id": student_id,
+        "name": "Aluno Benchmark",
+        "name_tokens": ["aluno", "benchmark"],
+        "photo_id": None,
+        "turma_id": turma_id,
+        "turma_name": "Benchmark",
+        "course_name": "Benchmark",
+        "status": "active",
+        "created_at": "2024-01-01T00:00:00+00:00",
+    })
+
+    token = create_access_token({"sub": "benchmark", "email": "benchmark@sge.local", "role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        await measure(lambda phone: one_round_trip(student_id, phone), 50)
+        report("find/update/find", await measure(lambda phone: three_round_trips(student_id, phone), edits))
+        report("find_one_and_update", await measure(lambda phone: one_round_trip(student_id, phone), edits))
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers) as client:
+            async def put(phone: str):
+                response = await client.put(f"/api/students/{student_id}", json={"phone": phone})
+                response.raise_for_status()
+
+            await measure(put, 50)
+            report("PUT /api/students/{id}", await measure(put, edits))
+    finally:
+        await db.students.delete_one({"id": student_id})
+        await db.turmas.delete_one({"id": turma_id})
+        await db.stats.delete_many({"key": {"$in": ["Benchmark", turma_id]}})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edits", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.edits))
@@ -0,0 +1,128 @@
+from database import db
+from cache import dashboard_cache
+from stats import apply_deltas
+from models import JobStatus
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Propagação de renomeações para os campos denormalizados (turma.course_name,
+# aluno.turma_name e aluno.course_name). Cada job relê os nomes atuais e só
+# atualiza o que está diferente, então pode ser reexecutado sem efeito colateral
+# e jobs fora de ordem convergem para o mesmo resultado.
+
+_tasks: Set[asyncio.Task] = set()
+_lock = asyncio.Lock()
+
+async def _step(job_id: str, collection: str, modified: int):
+    await db.jobs.update_one(
+        {"id": job_id},
+        {"$inc": {"done_steps": 1}, "$set": {f"modified.{collection}": modified}}
+    )
+
+async def _sync_students(match: dict, course_name: str, turma_name: Optional[str] = None) -> int:
+    """
+    Um único update_many nos alunos de `match`, mantendo os contadores por curso
+    """
+    stale_course = {**match, "course_name": {"$ne": course_name}}
+    moved: Dict[str, int] = Counter()
+    pipeline = [{"$match": stale_course}, {"$group": {"_id": "$course_name", "count": {"$sum": 1}}}]
+    async for row in db.students.aggregate(pipeline):
+        moved[row["_id"]] += row["count"]
+
+    update = {"course_name": course_name}
+    stale = [{"course_name": {"$ne": course_name}}]
+    if turma_name is not None:
+        update["turma_name"] = turma_name
+        stale.append({"turma_name": {"$ne": turma_name}})
+    result = await db.students.update_many({**match, "$or": stale}, {"$set": update})
+
+    if moved:
+        deltas = Counter({("course", old_name): -count for old_name, count in moved.items()})
+        deltas[("course", course_name)] += sum(moved.values())
+        await apply_deltas(deltas)
+    return result.modified_count
+
+async def _sync_course(job: dict):
+    course = await db.courses.find_one({"id": job["target_id"]}, {"_id": 0, "name": 1})
+    if course is None:
+        return
+    result = await db.turmas.update_many(
+        {"course_id": job["target_id"], "course_name": {"$ne": course["name"]}},
+        {"$set": {"course_name": course["name"]}}
+    )
+    await _step(job["id"], "turmas", result.modified_count)
+
+    turma_ids = await db.turmas.distinct("id", {"course_id": job["target_id"]})
+    modified = await _sync_students({"turma_id": {"$in": turma_ids}}, course["name"]) if turma_ids else 0
+    await _step(job["id"], "students", modified)
+
+async def _sync_turma(job: dict):
+    turma = await db.turmas.find_one({"id": job["target_id"]}, {"_id": 0, "name": 1, "course_name": 1})
+    if turma is None:
+        return
+    modified = await _sync_students({"turma_id": job["target_id"]}, turma["course_name"], turma["name"])
+    await _step(job["id"], "students", modified)
+
+JOB_KINDS = {"course": (_sync_course, 2), "turma": (_sync_turma, 1)}
+
+async def run_job(job_id: str):
+    # Um job por vez: renomeações seguidas do mesmo curso não disputam os mesmos alunos
+    async with _lock:
+        job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+        if job is None or job["status"] == JobStatus.DONE.value:
+            return
+        await db.jobs.update_one({"id": job_id}, {"$set": {"status": JobStatus.RUNNING.value, "done_steps": 0}})
+        try:
+            sync, _ = JOB_KINDS[job["kind"]]
+            await sync(job)
+            await db.jobs.update_one({"id": job_id}, {"$set": {
+                "status": JobStatus.DONE.value,
+                "finished_at": datetime.now(timezone.utc),
+            }})
+        except Exception as e:
+            logger.exception(f"Falha ao propagar renomeação ({job['kind']} {job['target_id']})")
+            await db.jobs.update_one({"id": job_id}, {"$set": {
+                "status": JobStatus.FAILED.value,
+                "error": str(e),
+                "finished_at": datetime.now(timezone.utc),
+            }})
+        finally:
+            dashboard_cache.invalidate()
+
+def _spawn(job_id: str):
+    task = asyncio.create_task(run_job(job_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+async def start_cascade(kind: str, target_id: str) -> str:
+    """
+    Registra e dispara em segundo plano a propagação dos nomes de um curso ou turma
+    """
+    job = {
+        "id": str(uuid.uuid4()),
+        "kind": kind,
+        "target_id": target_id,
+        "status": JobStatus.PENDING.value,
+        "total_steps": JOB_KINDS[kind][1],
+        "done_steps": 0,
+        "modified": {},
+        "error": None,
+        "created_at": datetime.now(timezone.utc),
+        "finished_at": None,
+    }
+    await db.jobs.insert_one(job)
+    _spawn(job["id"])
+    return job["id"]
+
+async def resume_jobs():
+    """
+    Retoma jobs interrompidos por um reinício do servidor
+    """
+    async for job in db.jobs.find({"status": {"$in": [JobStatus.PENDING.value, JobStatus.RUNNING.value]}}, {"_id": 0, "id": 1}):
+        _spawn(job["id"])
@@ -0,0 +1,152 @@
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from models import ExportFormat
+from datetime import date, datetime
+from enum import Enum
+from typing import AsyncIterator, List, Tuple
+import asyncio
+import csv
+import io
+import json
+import tempfile
+
+EXPORT_BATCH_SIZE = 500
+FILE_CHUNK_SIZE = 64 * 1024
+
+# Cabeçalhos compatíveis com a importação de alunos (student_import.COLUMN_ALIASES)
+STUDENT_COLUMNS = [
+    ("id", "id"),
+    ("name", "nome"),
+    ("email", "email"),
+    ("phone", "telefone"),
+    ("birth_date", "data de nascimento"),
+    ("turma_id", "turma_id"),
+    ("turma_name", "turma"),
+    ("course_name", "curso"),
+    ("status", "status"),
+    ("created_at", "criado em"),
+]
+
+TURMA_COLUMNS = [
+    ("id", "id"),
+    ("name", "nome"),
+    ("course_id", "curso_id"),
+    ("course_name", "curso"),
+    ("period", "período"),
+    ("year", "ano"),
+    ("active", "ativa"),
+    ("created_at", "criado em"),
+]
+
+COURSE_COLUMNS = [
+    ("id", "id"),
+    ("name", "nome"),
+    ("workload", "carga horária"),
+    ("description", "descrição"),
+    ("active", "ativo"),
+    ("created_at", "criado em"),
+]
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.JSONL: "application/x-ndjson",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+def projection(columns: List[Tuple[str, str]]) -> dict:
+    """
+    Projeção só com as colunas exportadas (nunca inclui fotos)
+    """
+    return {"_id": 0, **{field: 1 for field, _ in columns}}
+
+def _value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+async def _csv_chunks(cursor, columns) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    # BOM para o Excel reconhecer UTF-8
+    writer.writerow([header for _, header in columns])
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    rows = 0
+    buffer.seek(0)
+    buffer.truncate()
+    async for doc in cursor:
+        writer.writerow([_value(doc.get(field)) for field, _ in columns])
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+async def _jsonl_chunks(cursor, columns) -> AsyncIterator[bytes]:
+    lines = []
+    async for doc in cursor:
+        row = {field: _value(doc.get(field)) for field, _ in columns}
+        lines.append(json.dumps(row, ensure_ascii=False))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+async def _xlsx_chunks(cursor, columns, sheet_title: str) -> AsyncIterator[bytes]:
+    from openpyxl import Workbook
+
+    # O modo write_only grava as linhas em arquivo temporário à medida que chegam.
+    # Só o cursor é lido no event loop; as linhas, o save e a leitura do arquivo
+    # rodam numa thread. O XLSX é um zip e só pode ser enviado depois do save.
+    loop = asyncio.get_running_loop()
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title[:31])
+
+    def append_rows(rows):
+        for row in rows:
+            sheet.append(row)
+
+    rows = [[header for _, header in columns]]
+    async for doc in cursor:
+        rows.append([_value(doc.get(field)) for field, _ in columns])
+        if len(rows) >= EXPORT_BATCH_SIZE:
+            await loop.run_in_executor(None, append_rows, rows)
+            rows = []
+    if rows:
+        await loop.run_in_executor(None, append_rows, rows)
+
+    with tempfile.TemporaryFile() as output:
+        await loop.run_in_executor(None, workbook.save, output)
+        output.seek(0)
+        while chunk := await loop.run_in_executor(None, output.read, FILE_CHUNK_SIZE):
+            yield chunk
+
+def export_response(cursor, columns: List[Tuple[str, str]], export_format: ExportFormat, name: str) -> StreamingResponse:
+    """
+    Resposta em streaming que percorre o cursor do Motor em lotes, sem to_list
+    """
+    cursor = cursor.batch_size(EXPORT_BATCH_SIZE)
+    if export_format == ExportFormat.CSV:
+        chunks = _csv_chunks(cursor, columns)
+    elif export_format == ExportFormat.JSONL:
+        chunks = _jsonl_chunks(cursor, columns)
+    else:
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Exportação em XLSX indisponível (openpyxl não instalado)",
+            )
+        chunks = _xlsx_chunks(cursor, columns, name)
+
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'},
+    )
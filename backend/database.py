@@ -1,18 +1,234 @@
-from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
+from metrics import record_db_call
 from pathlib import Path
+import asyncio
+import logging
 import os
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+logger = logging.getLogger(__name__)
+
+# "mongo" (padrão) ou "sqlite" (banco embutido, sem servidor MongoDB)
+DB_BACKEND = os.environ.get("DB_BACKEND", "mongo").lower()
+EMBEDDED = DB_BACKEND == "sqlite"
+
+# Opções do cliente do MongoDB por variável de ambiente (ignoradas no banco embutido).
+# Só as variáveis definidas são repassadas; as demais ficam com o valor da MONGO_URL
+# ou o padrão do driver. MONGO_MIN_POOL_SIZE conexões são abertas já na inicialização.
+MONGO_CLIENT_ENV = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+}
+# Compressão do protocolo, em ordem de preferência (ex.: "zstd,snappy,zlib").
+# zstd requer o pacote zstandard e snappy o python-snappy; sem eles o driver ignora a opção com um aviso.
+MONGO_COMPRESSORS = os.environ.get("MONGO_COMPRESSORS")
+
+def mongo_client_options() -> dict:
+    options = {option: int(os.environ[name]) for name, option in MONGO_CLIENT_ENV.items() if os.environ.get(name)}
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return options
+
+if EMBEDDED:
+    from embedded_db import EmbeddedClient
+
+    # name_tokens é uma lista: a busca por prefixo usa o índice por elemento (multikey)
+    client = EmbeddedClient(
+        os.environ.get("SQLITE_PATH", str(ROOT_DIR / "sge.db")), on_call=record_db_call, multikey={"students": ["name_tokens"]}
+    )
+    db = client[os.environ.get("DB_NAME", "sge_database")]
+else:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from pymongo import monitoring
+    from pymongo.common import MAX_POOL_SIZE
+
+    import pool_monitor
+    import query_monitor
+
+    class CommandMonitor(monitoring.CommandListener):
+        """
+        Mede cada comando enviado ao MongoDB: soma na requisição que o originou
+        (métricas por rota) e alimenta o log de consultas lentas
+        """
+
+        def started(self, event):
+            query_monitor.command_started(event.connection_id, event.request_id, event.command_name, event.command)
+
+        def succeeded(self, event):
+            seconds = event.duration_micros / 1e6
+            record_db_call(seconds)
+            query_monitor.command_finished(event.connection_id, event.request_id, seconds)
+
+        def failed(self, event):
+            seconds = event.duration_micros / 1e6
+            record_db_call(seconds)
+            query_monitor.command_finished(event.connection_id, event.request_id, seconds)
+
+    class PoolMonitor(monitoring.ConnectionPoolListener):
+        """
+        Conexões abertas, em uso e na fila de espera de cada servidor, para /api/metrics
+        """
+
+        def pool_created(self, event):
+            pool_monitor.pool_created(event.address, event.options.get("maxPoolSize", MAX_POOL_SIZE))
+
+        def pool_ready(self, event):
+            pass
+
+        def pool_cleared(self, event):
+            pool_monitor.pool_cleared(event.address)
+
+        def pool_closed(self, event):
+            pool_monitor.pool_closed(event.address)
+
+        def connection_created(self, event):
+            pool_monitor.connection_created(event.address)
+
+        def connection_ready(self, event):
+            pass
+
+        def connection_closed(self, event):
+            pool_monitor.connection_closed(event.address)
+
+        def connection_check_out_started(self, event):
+            pool_monitor.checkout_started(event.address)
+
+        def connection_check_out_failed(self, event):
+            pool_monitor.checkout_failed(event.address)
+
+        def connection_checked_out(self, event):
+            pool_monitor.checked_out(event.address)
+
+        def connection_checked_in(self, event):
+            pool_monitor.checked_in(event.address)
+
+    mongo_url = os.environ['MONGO_URL']
+    # tz_aware: datas BSON voltam como datetime em UTC, iguais às gravadas pelas rotas
+    client = AsyncIOMotorClient(
+        mongo_url, tz_aware=True, event_listeners=[CommandMonitor(), PoolMonitor()], **mongo_client_options()
+    )
+    db = client[os.environ['DB_NAME']]
+
+COLLECTIONS_WITH_ID = ("users", "courses", "turmas", "students", "institution", "jobs")
+
+# Índices de versões anteriores que são prefixo de um índice composto (ou, no
+# caso de created_at -1, o mesmo índice lido ao contrário); init_db os remove
+REDUNDANT_INDEXES = {
+    "students": ["name_1", "turma_id_1", "created_at_-1"],
+}
+
+# Formatos das consultas feitas pelas rotas: (coleção, filtro, ordenação).
+# Os valores são apenas exemplos; o que importa para o plano é a forma.
+QUERY_SHAPES = [
+    ("users", {"id": ""}, None),
+    ("users", {"email": ""}, None),
+    ("courses", {"id": ""}, None),
+    ("courses", {"active": True}, None),
+    ("turmas", {"id": ""}, None),
+    ("turmas", {"active": True}, None),
+    ("turmas", {"course_id": ""}, None),
+    ("jobs", {"status": "running"}, None),
+    ("students", {"id": ""}, None),
+    ("students", {"photo_id": ""}, None),
+    ("students", {"status": "active"}, None),
+    ("students", {}, [("name", 1), ("id", 1)]),
+    ("students", {"turma_id": ""}, [("name", 1), ("id", 1)]),
+    ("students", {"status": "active"}, [("name", 1), ("id", 1)]),
+    ("students", {"turma_id": "", "status": "active"}, None),
+    ("students", {}, [("created_at", -1)]),
+    ("students", {"name_tokens": {"$regex": "^a"}}, [("name", 1), ("id", 1)]),
+    ("students", {"course_name": ""}, [("name", 1), ("id", 1)]),
+    ("students", {}, [("created_at", 1), ("name", 1), ("id", 1)]),
+    ("students", {}, [("turma_name", 1), ("name", 1), ("id", 1)]),
+    ("students", {}, [("course_name", 1), ("name", 1), ("id", 1)]),
+]
+
+async def warm_pool():
+    """
+    Abre as minPoolSize conexões (MONGO_MIN_POOL_SIZE ou MONGO_URL) de uma vez,
+    com pings simultâneos, para as primeiras requisições não pagarem o handshake
+    """
+    if EMBEDDED:
+        return
+    size = client.options.pool_options.min_pool_size
+    if not size:
+        return
+    await asyncio.gather(*(db.command("ping") for _ in range(size)))
+    logger.info(f"Pool do MongoDB aquecido com {size} conexões")
 
 async def init_db():
+    for collection in COLLECTIONS_WITH_ID:
+        await db[collection].create_index("id", unique=True)
+
     await db.users.create_index("email", unique=True)
     await db.courses.create_index("name")
+    await db.courses.create_index("active")
     await db.turmas.create_index("name")
-    await db.students.create_index("name")
-    await db.students.create_index("turma_id")
\ No newline at end of file
+    await db.turmas.create_index("active")
+    await db.turmas.create_index("course_id")
+    await db.jobs.create_index("status")
+    await db.jobs.create_index([("created_at", -1)])
+    await db.students.create_index("photo_id", sparse=True)
+    await db["photos.files"].create_index("metadata.variant_of", sparse=True)
+    await db.students.create_index([("name", 1), ("id", 1)])
+    await db.students.create_index([("turma_id", 1), ("name", 1), ("id", 1)])
+    await db.students.create_index([("status", 1), ("name", 1), ("id", 1)])
+    await db.students.create_index([("turma_id", 1), ("status", 1)])
+    await db.students.create_index("name_tokens")
+    await db.students.create_index([("course_name", 1), ("name", 1), ("id", 1)])
+    await db.students.create_index([("turma_name", 1), ("name", 1), ("id", 1)])
+    await db.students.create_index([("created_at", 1), ("name", 1), ("id", 1)])
+
+    for collection, names in REDUNDANT_INDEXES.items():
+        for name in names:
+            await _drop_index_if_exists(collection, name)
+
+async def _drop_index_if_exists(collection: str, name: str):
+    from pymongo.errors import OperationFailure
+
+    try:
+        await db[collection].drop_index(name)
+    except OperationFailure as e:
+        # 27 = IndexNotFound: base nova ou índice já removido
+        if e.code != 27:
+            raise
+
+def _has_collscan(plan) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collscan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(item) for item in plan)
+    return False
+
+async def _is_full_scan(collection: str, query: dict, sort) -> bool:
+    if EMBEDDED:
+        plan = await db[collection].query_plan(query, sort)
+        return any(step.startswith("SCAN") and "USING" not in step for step in plan)
+
+    find = {"find": collection, "filter": query}
+    if sort:
+        find["sort"] = dict(sort)
+    explain = await db.command({"explain": find, "verbosity": "queryPlanner"})
+    return _has_collscan(explain.get("queryPlanner", {}).get("winningPlan"))
+
+async def audit_indexes() -> list:
+    """
+    Executa explain em cada formato de QUERY_SHAPES e registra as consultas
+    que o banco resolveria com varredura completa da coleção
+    """
+    unindexed = []
+    for collection, query, sort in QUERY_SHAPES:
+        if await _is_full_scan(collection, query, sort):
+            unindexed.append((collection, query, sort))
+            logger.warning(f"Consulta sem índice em {collection}: filtro={query} ordenação={sort}")
+
+    logger.info(f"Auditoria de índices: {len(QUERY_SHAPES)} consultas verificadas, {len(unindexed)} sem índice")
+    return unindexed
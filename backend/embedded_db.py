@@ -0,0 +1,999 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import contextvars
+import copy
+import functools
+import json
+import os
+import re
+import sqlite3
+import time
+import uuid
+
+# Banco embutido (SQLite) com o subconjunto da API do Motor usado pelas rotas.
+# Cada coleção é uma tabela (_id, doc) com o documento em JSON; filtros e
+# ordenações viram SQL sobre json_extract, que aproveita índices de expressão.
+# Campos de lista declarados como multikey ganham uma tabela auxiliar com um
+# elemento por linha, indexada, mantida por triggers.
+# O pymongo (erros e classes de resultado) só é importado na primeira escrita,
+# para não pesar na inicialização do aplicativo desktop.
+
+class NoFile(Exception):
+    """Arquivo inexistente no armazenamento de fotos (equivale a gridfs.errors.NoFile)"""
+
+def _result(kind: str, raw):
+    from pymongo import results
+
+    return getattr(results, kind)(raw, True)
+
+_FIELD_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$")
+
+def _regexp(pattern: str, value) -> bool:
+    return value is not None and _compiled(pattern).search(str(value)) is not None
+
+@functools.lru_cache(maxsize=256)
+def _compiled(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
+# Datas viram texto ISO em UTC com largura fixa, então a ordem do texto é a
+# cronológica. DATES_KEY lista os campos de topo que voltam como datetime na
+# leitura, como o Motor devolve com tz_aware=True.
+DATES_KEY = "$dates"
+
+def _date_text(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+def _param(value):
+    """
+    Converte um valor de filtro para o tipo gravado no JSON
+    """
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, datetime):
+        return _date_text(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def _json_default(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return _date_text(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Tipo não suportado no banco embutido: {type(value).__name__}")
+
+def _dumps(doc: dict) -> str:
+    data = {k: v for k, v in doc.items() if k != "_id"}
+    dates = [k for k, v in data.items() if isinstance(v, datetime)]
+    if dates:
+        data[DATES_KEY] = dates
+    return json.dumps(data, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+def _loads(raw: str) -> dict:
+    doc = json.loads(raw)
+    for key in doc.pop(DATES_KEY, ()):
+        doc[key] = datetime.fromisoformat(doc[key])
+    return doc
+
+def _load(row) -> dict:
+    return {"_id": row[0], **_loads(row[1])}
+
+def _field(path: str) -> str:
+    if path == "_id":
+        return "_id"
+    if not _FIELD_RE.match(path):
+        raise ValueError(f"Campo inválido: {path}")
+    return f"json_extract(doc, '$.{path}')"
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def _json_path(path: str) -> str:
+    _field(path)
+    return f"'$.{path}'"
+
+def _regex_pattern(pattern, options: str = "") -> str:
+    if isinstance(pattern, re.Pattern):
+        if pattern.flags & re.IGNORECASE:
+            options += "i"
+        pattern = pattern.pattern
+    flags = "".join(flag for flag in "imsx" if flag in options)
+    return f"(?{flags}){pattern}" if flags else pattern
+
+# ---------------------------------------------------------------- filtros
+
+def _compile_filter(query: Optional[dict], params: list, multikey: Optional[Dict[str, str]] = None) -> str:
+    """
+    Filtro do Mongo em SQL. `multikey` mapeia campos de lista para a tabela
+    auxiliar com um elemento por linha (ver EmbeddedCollection)
+    """
+    clauses = []
+    for key, value in (query or {}).items():
+        if key in ("$and", "$or", "$nor"):
+            parts = [_compile_filter(sub, params, multikey) for sub in value]
+            joined = f"({' AND '.join(parts)})" if key == "$and" else f"({' OR '.join(parts)})"
+            clauses.append(f"NOT {joined}" if key == "$nor" else joined)
+        elif key.startswith("$"):
+            raise NotImplementedError(f"Operador não suportado no banco embutido: {key}")
+        else:
+            clauses.append(_compile_condition(key, value, params, multikey))
+    return " AND ".join(clauses) or "1"
+
+def _compile_condition(path: str, condition, params: list, multikey: Optional[Dict[str, str]] = None) -> str:
+    elements = (multikey or {}).get(path)
+    if isinstance(condition, re.Pattern):
+        return _compile_regex(path, _regex_pattern(condition), params, elements)
+    if not (isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition)):
+        return _compile_operator(path, "$eq", condition, params, elements)
+
+    options = condition.get("$options", "")
+    clauses = []
+    for op, value in condition.items():
+        if op == "$options":
+            continue
+        if op == "$regex":
+            clauses.append(_compile_regex(path, _regex_pattern(value, options), params, elements))
+        else:
+            clauses.append(_compile_operator(path, op, value, params, elements))
+    return " AND ".join(clauses)
+
+_REGEX_META = set(".^$*+?{}[]|()")
+
+def _literal_prefix(pattern: str) -> str:
+    """
+    Texto fixo no início de uma regex ancorada ("^joa" -> "joa"), que vira um
+    intervalo no índice; vazio se a regex não começa com ^, tem flags ou alternativas
+    """
+    if not pattern.startswith("^") or "|" in pattern:
+        return ""
+    prefix, index = "", 1
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\" and index + 1 < len(pattern) and not pattern[index + 1].isalnum():
+            char, step = pattern[index + 1], 2
+        elif char in _REGEX_META or char == "\\":
+            break
+        else:
+            step = 1
+        # Um quantificador logo depois torna o último caractere opcional
+        if pattern[index + step:index + step + 1] in ("*", "?", "{"):
+            break
+        prefix += char
+        index += step
+    return prefix
+
+def _compile_elements(elements: str, condition: str) -> str:
+    return f"_id IN (SELECT _id FROM {elements} WHERE {condition})"
+
+def _compile_regex(path: str, pattern: str, params: list, elements: Optional[str] = None) -> str:
+    if elements:
+        prefix = _literal_prefix(pattern)
+        params.append(pattern)
+        if not prefix:
+            return _compile_elements(elements, "regexp(?, value)")
+        # O intervalo [prefixo, prefixo seguinte) usa o índice; a regex confirma
+        params[-1:-1] = [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+        return _compile_elements(elements, "value >= ? AND value < ? AND regexp(?, value)")
+    params.append(pattern)
+    if path == "_id":
+        return "regexp(?, _id)"
+    # json_each percorre os elementos de arrays e devolve o próprio valor para escalares
+    return f"EXISTS (SELECT 1 FROM json_each(doc, {_json_path(path)}) WHERE regexp(?, value))"
+
+_COMPARISONS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+def _compile_operator(path: str, op: str, value, params: list, elements: Optional[str] = None) -> str:
+    # Em campos de lista, igualdade casa com qualquer elemento, como no Mongo
+    if elements and op == "$eq" and value is not None:
+        params.append(_param(value))
+        return _compile_elements(elements, "value = ?")
+    if elements and op == "$in" and value and None not in value:
+        params.extend(_param(v) for v in value)
+        return _compile_elements(elements, f"value IN ({', '.join('?' * len(value))})")
+    field = _field(path)
+    if op == "$eq":
+        if value is None:
+            return f"{field} IS NULL"
+        params.append(_param(value))
+        return f"{field} = ?"
+    if op == "$ne":
+        if value is None:
+            return f"{field} IS NOT NULL"
+        params.append(_param(value))
+        return f"({field} IS NULL OR {field} != ?)"
+    if op in _COMPARISONS:
+        params.append(_param(value))
+        return f"{field} {_COMPARISONS[op]} ?"
+    if op in ("$in", "$nin"):
+        values = [_param(v) for v in value if v is not None]
+        has_null = len(values) != len(value)
+        params.extend(values)
+        in_clause = f"{field} IN ({', '.join('?' * len(values))})" if values else "0"
+        if op == "$in":
+            return f"({in_clause} OR {field} IS NULL)" if has_null else in_clause
+        if has_null:
+            return f"({field} IS NOT NULL AND NOT {in_clause})"
+        return f"({field} IS NULL OR NOT {in_clause})"
+    if op == "$exists":
+        if path == "_id":
+            return "1" if value else "0"
+        return f"json_type(doc, {_json_path(path)}) IS {'NOT ' if value else ''}NULL"
+    raise NotImplementedError(f"Operador não suportado no banco embutido: {op}")
+
+def _sort_spec(key_or_list, direction=None) -> List[Tuple[str, int]]:
+    if key_or_list is None:
+        return []
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return [(key, value) for key, value in key_or_list]
+
+def _order_by(sort: List[Tuple[str, int]]) -> str:
+    if not sort:
+        return ""
+    return " ORDER BY " + ", ".join(f"{_field(key)} {'DESC' if direction == -1 else 'ASC'}" for key, direction in sort)
+
+# ---------------------------------------------------------------- documentos
+
+def _get(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def _set(doc: dict, path: str, value):
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[last] = value
+
+def _unset(doc: dict, path: str):
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(last, None)
+
+def _project(doc: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return doc
+    include_id = bool(projection.get("_id", 1))
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if any(fields.values()):
+        result = {"_id": doc["_id"]} if include_id and "_id" in doc else {}
+        for path, include in fields.items():
+            value = _get(doc, path)
+            if include and (value is not None or _has_path(doc, path)):
+                _set(result, path, value)
+        return result
+    result = dict(doc)
+    for path in fields:
+        _unset(result, path)
+    if not include_id:
+        result.pop("_id", None)
+    return result
+
+def _has_path(doc: dict, path: str) -> bool:
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return False
+    return last in doc
+
+def _apply_update(doc: dict, update: dict, inserting: bool = False) -> dict:
+    if not any(key.startswith("$") for key in update):
+        return {**({"_id": doc["_id"]} if "_id" in doc else {}), **update}
+    for op, fields in update.items():
+        if op == "$set":
+            for path, value in fields.items():
+                _set(doc, path, value)
+        elif op == "$unset":
+            for path in fields:
+                _unset(doc, path)
+        elif op == "$inc":
+            for path, value in fields.items():
+                _set(doc, path, (_get(doc, path) or 0) + value)
+        elif op == "$setOnInsert":
+            if inserting:
+                for path, value in fields.items():
+                    _set(doc, path, value)
+        elif op == "$push":
+            for path, value in fields.items():
+                current = _get(doc, path) or []
+                _set(doc, path, current + [value])
+        else:
+            raise NotImplementedError(f"Operador de atualização não suportado no banco embutido: {op}")
+    return doc
+
+def _upsert_seed(query: dict) -> dict:
+    # Campos de igualdade do filtro entram no documento criado pelo upsert
+    doc = {}
+    for key, value in query.items():
+        if key == "$and":
+            for sub in value:
+                doc.update(_upsert_seed(sub))
+        elif not key.startswith("$") and not (isinstance(value, dict) and any(k.startswith("$") for k in value)):
+            _set(doc, key, value)
+        elif isinstance(value, dict) and "$eq" in value:
+            _set(doc, key, value["$eq"])
+    return doc
+
+def _normalize(doc: dict) -> dict:
+    # Mesmo formato que volta do banco (enums como valor, datas em UTC)
+    return {**({"_id": doc["_id"]} if "_id" in doc else {}), **_loads(_dumps(doc))}
+
+# ---------------------------------------------------------------- agregação
+
+def _expression(doc: dict, expression):
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get(doc, expression[1:])
+    return expression
+
+def _sort_documents(docs: List[dict], sort: List[Tuple[str, int]]) -> List[dict]:
+    for key, direction in reversed(sort):
+        docs.sort(key=lambda doc: (_get(doc, key) is not None, _get(doc, key)), reverse=direction == -1)
+    return docs
+
+def _project_stage(doc: dict, spec: dict) -> dict:
+    computed = {key: value for key, value in spec.items() if not isinstance(value, (bool, int))}
+    flags = {key: value for key, value in spec.items() if key not in computed}
+    if computed and not any(value for key, value in flags.items() if key != "_id"):
+        result = {"_id": doc.get("_id")} if flags.get("_id", 1) else {}
+    else:
+        result = _project(doc, flags)
+    for key, value in computed.items():
+        _set(result, key, _expression(doc, value))
+    return result
+
+_SQL_ACCUMULATORS = {"$sum": "SUM", "$avg": "AVG", "$min": "MIN", "$max": "MAX"}
+
+# ---------------------------------------------------------------- cursores
+
+class EmbeddedCursor:
+    """
+    Cursor no estilo do Motor: sort/skip/limit/batch_size encadeáveis,
+    to_list e iteração assíncrona em lotes
+    """
+
+    def __init__(self, collection: "EmbeddedCollection", query: Optional[dict] = None, projection: Optional[dict] = None,
+                 sort=None, skip: int = 0, limit: int = 0):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = _sort_spec(sort)
+        self._skip = skip
+        self._limit = limit
+        self._batch_size = 100
+
+    def sort(self, key_or_list, direction=None) -> "EmbeddedCursor":
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int) -> "EmbeddedCursor":
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> "EmbeddedCursor":
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int) -> "EmbeddedCursor":
+        self._batch_size = batch_size or 100
+        return self
+
+    def _statement(self, limit: int) -> Tuple[str, list]:
+        params: list = []
+        where = _compile_filter(self._query, params, self._collection._multikey)
+        sql = f"SELECT _id, doc FROM {self._collection._table} WHERE {where}{_order_by(self._sort)}"
+        if limit or self._skip:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit or -1, self._skip]
+        return sql, params
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        limit = min(filter(None, (self._limit, length)), default=0)
+        sql, params = self._statement(limit)
+
+        def fetch():
+            return [_project(_load(row), self._projection) for row in self._collection._conn.execute(sql, params)]
+
+        return await self._collection._client.run(fetch)
+
+    async def __aiter__(self):
+        sql, params = self._statement(self._limit)
+        cursor = await self._collection._client.run(self._collection._conn.execute, sql, params)
+        try:
+            while True:
+                rows = await self._collection._client.run(cursor.fetchmany, self._batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _project(_load(row), self._projection)
+        finally:
+            await self._collection._client.run(cursor.close)
+
+class EmbeddedCommandCursor:
+    """
+    Resultado de aggregate: to_list e iteração assíncrona
+    """
+
+    def __init__(self, load: Callable[[], Any]):
+        self._load = load
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        docs = await self._load()
+        return docs[:length] if length else docs
+
+    async def __aiter__(self):
+        for doc in await self._load():
+            yield doc
+
+# ---------------------------------------------------------------- coleções
+
+class EmbeddedCollection:
+    def __init__(self, client: "EmbeddedClient", name: str):
+        self._client = client
+        self._conn = client._conn
+        self.name = name
+        self._table = '"' + name.replace('"', '""') + '"'
+        client.ensure_table(self._table)
+        # Campo de lista -> tabela auxiliar (_id, value) com um elemento por linha
+        self._multikey = {path: client.ensure_elements(name, path) for path in client.multikey.get(name, ())}
+
+    # --- leitura
+
+    def find(self, filter: Optional[dict] = None, projection: Optional[dict] = None, sort=None, skip: int = 0, limit: int = 0, **kwargs) -> EmbeddedCursor:
+        return EmbeddedCursor(self, filter, projection, sort=sort, skip=skip, limit=limit)
+
+    async def find_one(self, filter: Optional[dict] = None, projection: Optional[dict] = None, sort=None, **kwargs) -> Optional[dict]:
+        docs = await self.find(filter, projection, sort=sort).to_list(1)
+        return docs[0] if docs else None
+
+    async def count_documents(self, filter: dict, limit: int = 0, skip: int = 0, **kwargs) -> int:
+        params: list = []
+        where = _compile_filter(filter, params, self._multikey)
+        sql = f"SELECT COUNT(*) FROM (SELECT 1 FROM {self._table} WHERE {where} LIMIT ? OFFSET ?)"
+        return await self._client.run(self._scalar, sql, params + [limit or -1, skip])
+
+    async def estimated_document_count(self, **kwargs) -> int:
+        return await self._client.run(self._scalar, f"SELECT COUNT(*) FROM {self._table}", [])
+
+    async def distinct(self, key: str, filter: Optional[dict] = None, **kwargs) -> list:
+        params: list = []
+        where = _compile_filter(filter, params, self._multikey)
+        if key == "_id":
+            sql = f"SELECT DISTINCT _id FROM {self._table} WHERE {where}"
+        else:
+            sql = f"SELECT DISTINCT item.value FROM {self._table}, json_each(doc, {_json_path(key)}) AS item WHERE {where}"
+
+        def fetch():
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+        return await self._client.run(fetch)
+
+    def aggregate(self, pipeline: List[dict], **kwargs) -> EmbeddedCommandCursor:
+        return EmbeddedCommandCursor(lambda: self._client.run(self._aggregate, list(pipeline)))
+
+    def _scalar(self, sql: str, params: list):
+        return self._conn.execute(sql, params).fetchone()[0]
+
+    def _select(self, query: Optional[dict], sort=None, limit: int = 0) -> List[dict]:
+        params: list = []
+        sql = f"SELECT _id, doc FROM {self._table} WHERE {_compile_filter(query, params, self._multikey)}{_order_by(_sort_spec(sort))}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [_load(row) for row in self._conn.execute(sql, params)]
+
+    def _aggregate(self, pipeline: List[dict]) -> List[dict]:
+        match: List[dict] = []
+        while pipeline and "$match" in pipeline[0]:
+            match.append(pipeline.pop(0)["$match"])
+        query = {"$and": match} if match else {}
+
+        if pipeline and "$group" in pipeline[0] and self._can_group_in_sql(pipeline[0]["$group"]):
+            docs = self._group_sql(query, pipeline.pop(0)["$group"])
+        else:
+            docs = self._select(query)
+
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$group":
+                docs = self._group_python(docs, spec)
+            elif op == "$project":
+                docs = [_project_stage(doc, spec) for doc in docs]
+            elif op == "$sort":
+                docs = _sort_documents(docs, _sort_spec(spec))
+            elif op == "$skip":
+                docs = docs[spec:]
+            elif op == "$limit":
+                docs = docs[:spec]
+            elif op == "$count":
+                docs = [{spec: len(docs)}]
+            else:
+                raise NotImplementedError(f"Estágio não suportado no banco embutido: {op}")
+        return docs
+
+    @staticmethod
+    def _can_group_in_sql(spec: dict) -> bool:
+        group_id = spec["_id"]
+        if not (group_id is None or isinstance(group_id, str) and group_id.startswith("$")):
+            return False
+        for key, accumulator in spec.items():
+            if key == "_id":
+                continue
+            (op, value), = accumulator.items()
+            if op not in _SQL_ACCUMULATORS or not (isinstance(value, (int, float)) or isinstance(value, str) and value.startswith("$")):
+                return False
+        return True
+
+    def _group_sql(self, query: dict, spec: dict) -> List[dict]:
+        # Agrupamento simples ($campo + $sum/$avg/$min/$max) resolvido pelo próprio SQLite
+        params: list = []
+        where = _compile_filter(query, params, self._multikey)
+        group_id = spec["_id"]
+        key_sql = _field(group_id[1:]) if group_id else "NULL"
+        columns, names = [], []
+        for key, accumulator in spec.items():
+            if key == "_id":
+                continue
+            (op, value), = accumulator.items()
+            operand = _field(value[1:]) if isinstance(value, str) else repr(value)
+            columns.append(f"{_SQL_ACCUMULATORS[op]}({operand})")
+            names.append(key)
+        select = ", ".join([key_sql] + columns)
+        group_by = f" GROUP BY {key_sql}" if group_id else ""
+        if not group_id and not self._scalar(f"SELECT COUNT(*) FROM {self._table} WHERE {where}", params):
+            return []
+        rows = self._conn.execute(f"SELECT {select} FROM {self._table} WHERE {where}{group_by}", params).fetchall()
+        return [{"_id": row[0], **dict(zip(names, row[1:]))} for row in rows]
+
+    @staticmethod
+    def _group_python(docs: List[dict], spec: dict) -> List[dict]:
+        groups: Dict[Any, dict] = {}
+        for doc in docs:
+            key = _expression(doc, spec["_id"])
+            hashable = json.dumps(key, sort_keys=True, default=str)
+            group = groups.setdefault(hashable, {"_id": key})
+            for field, accumulator in spec.items():
+                if field == "_id":
+                    continue
+                (op, value), = accumulator.items()
+                value = _expression(doc, value)
+                if op == "$sum":
+                    group[field] = group.get(field, 0) + (value or 0)
+                elif op == "$min":
+                    group[field] = value if field not in group else min(group[field], value)
+                elif op == "$max":
+                    group[field] = value if field not in group else max(group[field], value)
+                elif op == "$first":
+                    group.setdefault(field, value)
+                elif op == "$push":
+                    group.setdefault(field, []).append(value)
+                else:
+                    raise NotImplementedError(f"Acumulador não suportado no banco embutido: {op}")
+        return list(groups.values())
+
+    # --- escrita
+
+    def _transaction(self, func: Callable, *args):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(*args)
+        except BaseException as e:
+            from pymongo.errors import BulkWriteError
+
+            # Como no MongoDB, o que foi gravado antes de um erro em lote permanece
+            self._conn.execute("COMMIT" if isinstance(e, BulkWriteError) else "ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return result
+
+    def _duplicate_key_error(self, error: sqlite3.IntegrityError):
+        from pymongo.errors import DuplicateKeyError
+
+        return DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} ({error})", 11000)
+
+    def _insert(self, doc: dict):
+        if "_id" not in doc:
+            doc["_id"] = uuid.uuid4().hex
+        try:
+            self._conn.execute(f"INSERT INTO {self._table} (_id, doc) VALUES (?, ?)", (_param(doc["_id"]), _dumps(doc)))
+        except sqlite3.IntegrityError as e:
+            raise self._duplicate_key_error(e)
+
+    def _replace(self, doc: dict):
+        try:
+            self._conn.execute(f"UPDATE {self._table} SET doc = ? WHERE _id = ?", (_dumps(doc), doc["_id"]))
+        except sqlite3.IntegrityError as e:
+            raise self._duplicate_key_error(e)
+
+    def _insert_many(self, docs: List[dict], ordered: bool) -> List:
+        from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+        errors = []
+        for index, doc in enumerate(docs):
+            try:
+                self._insert(doc)
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e), "op": doc})
+                if ordered:
+                    break
+        if errors:
+            inserted = errors[0]["index"] if ordered else len(docs) - len(errors)
+            raise BulkWriteError({"writeErrors": errors, "nInserted": inserted})
+        return [doc["_id"] for doc in docs]
+
+    def _update(self, query: dict, update: dict, upsert: bool, many: bool) -> dict:
+        docs = self._select(query, limit=0 if many else 1)
+        if not docs:
+            if not upsert:
+                return {"n": 0, "nModified": 0}
+            doc = _apply_update(_upsert_seed(query), update, inserting=True)
+            self._insert(doc)
+            return {"n": 1, "nModified": 0, "upserted": doc["_id"]}
+
+        modified = 0
+        for doc in docs:
+            updated = _normalize(_apply_update(copy.deepcopy(doc), update))
+            if updated != doc:
+                self._replace(updated)
+                modified += 1
+        return {"n": len(docs), "nModified": modified}
+
+    def _delete(self, query: dict, many: bool) -> int:
+        params: list = []
+        where = _compile_filter(query, params, self._multikey)
+        if not many:
+            where = f"_id IN (SELECT _id FROM {self._table} WHERE {where} LIMIT 1)"
+        return self._conn.execute(f"DELETE FROM {self._table} WHERE {where}", params).rowcount
+
+    def _find_one_and_update(self, query: dict, update: dict, projection, sort, upsert: bool, return_document) -> Optional[dict]:
+        docs = self._select(query, sort=sort, limit=1)
+        if not docs:
+            if not upsert:
+                return None
+            doc = _apply_update(_upsert_seed(query), update, inserting=True)
+            self._insert(doc)
+            return _project(_normalize(doc), projection) if return_document else None
+        before = docs[0]
+        after = _normalize(_apply_update(copy.deepcopy(before), update))
+        if after != before:
+            self._replace(after)
+        # ReturnDocument.AFTER é True e ReturnDocument.BEFORE é False
+        return _project(after if return_document else before, projection)
+
+    def _find_one_and_delete(self, query: dict, projection, sort) -> Optional[dict]:
+        docs = self._select(query, sort=sort, limit=1)
+        if not docs:
+            return None
+        self._conn.execute(f"DELETE FROM {self._table} WHERE _id = ?", (docs[0]["_id"],))
+        return _project(docs[0], projection)
+
+    def _bulk_write(self, requests: Iterable, ordered: bool) -> dict:
+        from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+        result = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0, "upserted": [], "writeErrors": []}
+        for index, request in enumerate(requests):
+            kind = type(request).__name__
+            try:
+                if kind == "InsertOne":
+                    self._insert(request._doc)
+                    result["nInserted"] += 1
+                elif kind in ("UpdateOne", "UpdateMany", "ReplaceOne"):
+                    raw = self._update(request._filter, request._doc, request._upsert, kind == "UpdateMany")
+                    if "upserted" in raw:
+                        result["nUpserted"] += 1
+                        result["upserted"].append({"index": index, "_id": raw["upserted"]})
+                    else:
+                        result["nMatched"] += raw["n"]
+                        result["nModified"] += raw["nModified"]
+                elif kind in ("DeleteOne", "DeleteMany"):
+                    result["nRemoved"] += self._delete(request._filter, kind == "DeleteMany")
+                else:
+                    raise NotImplementedError(f"Operação não suportada no banco embutido: {kind}")
+            except DuplicateKeyError as e:
+                result["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e), "op": getattr(request, "_doc", None)})
+                if ordered:
+                    break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return result
+
+    async def insert_one(self, document: dict, **kwargs):
+        await self._client.run(self._transaction, self._insert, document)
+        return _result("InsertOneResult", document["_id"])
+
+    async def insert_many(self, documents: Iterable[dict], ordered: bool = True, **kwargs):
+        docs = list(documents)
+        ids = await self._client.run(self._transaction, self._insert_many, docs, ordered)
+        return _result("InsertManyResult", ids)
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False, **kwargs):
+        raw = await self._client.run(self._transaction, self._update, filter, update, upsert, False)
+        return _result("UpdateResult", raw)
+
+    async def update_many(self, filter: dict, update: dict, upsert: bool = False, **kwargs):
+        raw = await self._client.run(self._transaction, self._update, filter, update, upsert, True)
+        return _result("UpdateResult", raw)
+
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False, **kwargs):
+        raw = await self._client.run(self._transaction, self._update, filter, replacement, upsert, False)
+        return _result("UpdateResult", raw)
+
+    async def delete_one(self, filter: dict, **kwargs):
+        deleted = await self._client.run(self._transaction, self._delete, filter, False)
+        return _result("DeleteResult", {"n": deleted})
+
+    async def delete_many(self, filter: dict, **kwargs):
+        deleted = await self._client.run(self._transaction, self._delete, filter, True)
+        return _result("DeleteResult", {"n": deleted})
+
+    async def find_one_and_update(self, filter: dict, update: dict, projection: Optional[dict] = None, sort=None,
+                                  upsert: bool = False, return_document: bool = False, **kwargs) -> Optional[dict]:
+        return await self._client.run(
+            self._transaction, self._find_one_and_update, filter, update, projection, _sort_spec(sort), upsert, return_document
+        )
+
+    async def find_one_and_delete(self, filter: dict, projection: Optional[dict] = None, sort=None, **kwargs) -> Optional[dict]:
+        return await self._client.run(self._transaction, self._find_one_and_delete, filter, projection, _sort_spec(sort))
+
+    async def bulk_write(self, requests: Iterable, ordered: bool = True, **kwargs):
+        requests = list(requests)
+        raw = await self._client.run(self._transaction, self._bulk_write, requests, ordered)
+        return _result("BulkWriteResult", raw)
+
+    # --- índices
+
+    async def create_index(self, keys, unique: bool = False, sparse: bool = False, name: Optional[str] = None, **kwargs) -> str:
+        spec = _sort_spec(keys, 1)
+        if [key for key, _ in spec] == ["_id"]:
+            return "_id_"
+        name = name or "_".join(f"{key}_{direction}" for key, direction in spec)
+        if len(spec) == 1 and spec[0][0] in self._multikey:
+            # Índice multikey: fica na tabela auxiliar, por elemento
+            elements = self._multikey[spec[0][0]]
+            await self._client.run(
+                self._conn.execute, f"CREATE INDEX IF NOT EXISTS {_quote(f'{self.name}.{name}')} ON {elements} (value, _id)"
+            )
+            return name
+        index = '"' + f"{self.name}.{name}".replace('"', '""') + '"'
+        columns = ", ".join(f"{_field(key)} {'DESC' if direction == -1 else 'ASC'}" for key, direction in spec)
+        sql = f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {index} ON {self._table} ({columns})"
+        if sparse:
+            sql += " WHERE " + " AND ".join(f"{_field(key)} IS NOT NULL" for key, _ in spec)
+        await self._client.run(self._conn.execute, sql)
+        return name
+
+    async def drop_index(self, index_or_name, **kwargs):
+        name = index_or_name if isinstance(index_or_name, str) else "_".join(
+            f"{key}_{direction}" for key, direction in _sort_spec(index_or_name, 1)
+        )
+        await self._client.run(self._conn.execute, f"DROP INDEX IF EXISTS {_quote(f'{self.name}.{name}')}")
+
+    async def drop_indexes(self, **kwargs):
+        def drop():
+            tables = [self.name] + [elements[1:-1].replace('""', '"') for elements in self._multikey.values()]
+            rows = self._conn.execute(
+                f"SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+                f"AND tbl_name IN ({', '.join('?' * len(tables))}) AND name NOT LIKE '%$!_id' ESCAPE '!'",
+                tables,
+            ).fetchall()
+            for (index,) in rows:
+                self._conn.execute('DROP INDEX IF EXISTS "' + index.replace('"', '""') + '"')
+
+        await self._client.run(drop)
+
+    async def query_plan(self, filter: dict, sort=None) -> List[str]:
+        """
+        Plano do SQLite (EXPLAIN QUERY PLAN) para o filtro e a ordenação
+        """
+        params: list = []
+        sql = f"EXPLAIN QUERY PLAN SELECT _id, doc FROM {self._table} WHERE {_compile_filter(filter, params, self._multikey)}{_order_by(_sort_spec(sort))}"
+
+        def fetch():
+            return [row[-1] for row in self._conn.execute(sql, params)]
+
+        return await self._client.run(fetch)
+
+class EmbeddedDatabase:
+    def __init__(self, client: "EmbeddedClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, EmbeddedCollection] = {}
+
+    def __getitem__(self, name: str) -> EmbeddedCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = EmbeddedCollection(self.client, name)
+        return collection
+
+    def __getattr__(self, name: str) -> EmbeddedCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command: dict, **kwargs):
+        raise NotImplementedError("Comandos do MongoDB não existem no banco embutido")
+
+class EmbeddedClient:
+    """
+    Conexão única com o arquivo SQLite (WAL). Todas as operações rodam em uma
+    thread dedicada, em série, sem bloquear o event loop.
+    """
+
+    def __init__(self, path: str, on_call: Optional[Callable[[float], None]] = None,
+                 multikey: Optional[Dict[str, Iterable[str]]] = None):
+        self.path = Path(path)
+        # Recebe a duração de cada operação (inclui a espera na fila da thread do banco)
+        self.on_call = on_call
+        # Campos que guardam listas, por coleção (ex.: {"students": ["name_tokens"]}).
+        # Cada elemento vira uma linha de uma tabela auxiliar mantida por triggers,
+        # para que busca e igualdade por elemento usem índice, como o multikey do Mongo.
+        self.multikey = {collection: tuple(paths) for collection, paths in (multikey or {}).items()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.create_function("regexp", 2, _regexp, deterministic=True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._tables = set()
+        self._databases: Dict[str, EmbeddedDatabase] = {}
+
+    def __getitem__(self, name: str) -> EmbeddedDatabase:
+        database = self._databases.get(name)
+        if database is None:
+            database = self._databases[name] = EmbeddedDatabase(self, name)
+        return database
+
+    def ensure_table(self, table: str):
+        if table not in self._tables:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (_id PRIMARY KEY, doc TEXT NOT NULL)")
+            self._tables.add(table)
+
+    def ensure_elements(self, collection: str, path: str) -> str:
+        """
+        Cria a tabela auxiliar do campo de lista `path`, já preenchida com os
+        documentos existentes, e os triggers que a mantêm em sincronia
+        """
+        name = f"{collection}${path}"
+        elements = _quote(name)
+        if elements in self._tables:
+            return elements
+        table = _quote(collection)
+        source = f"json_each(NEW.doc, {_json_path(path)})"
+        # Um único comando: a tabela nunca existe vazia com documentos por indexar
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {elements} AS "
+            f"SELECT t._id AS _id, item.value AS value FROM {table} AS t, json_each(t.doc, {_json_path(path)}) AS item"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(name + '$_id')} ON {elements} (_id)")
+        self._conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {_quote(name + '.insert')} AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {elements} SELECT NEW._id, value FROM {source}; END"
+        )
+        self._conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {_quote(name + '.update')} AFTER UPDATE OF doc ON {table} BEGIN "
+            f"DELETE FROM {elements} WHERE _id = OLD._id; INSERT INTO {elements} SELECT NEW._id, value FROM {source}; END"
+        )
+        self._conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {_quote(name + '.delete')} AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {elements} WHERE _id = OLD._id; END"
+        )
+        self._tables.add(elements)
+        return elements
+
+    async def run(self, func: Callable, *args):
+        # Copia o contexto, como o Motor faz, para contextvars valerem na thread do banco
+        context = contextvars.copy_context()
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(context.run, func, *args))
+        finally:
+            if self.on_call is not None:
+                self.on_call(time.perf_counter() - started)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+# ---------------------------------------------------------------- fotos
+
+class EmbeddedGridOut:
+    def __init__(self, path: Path, file_doc: dict, chunk_size: int):
+        self._path = path
+        self._position = 0
+        self._chunk_size = chunk_size
+        self._id = file_doc["_id"]
+        self.filename = file_doc["filename"]
+        self.length = file_doc["length"]
+        self.metadata = file_doc.get("metadata")
+
+    async def _read(self, size: int) -> bytes:
+        # Abre e fecha o arquivo a cada leitura, guardando só a posição: nenhum
+        # descritor fica aberto se quem lê parar antes do fim
+        def read():
+            with open(self._path, "rb") as file:
+                file.seek(self._position)
+                data = file.read(size)
+            self._position += len(data)
+            return data
+        return await asyncio.get_running_loop().run_in_executor(None, read)
+
+    async def readchunk(self) -> bytes:
+        return await self._read(self._chunk_size)
+
+    async def read(self) -> bytes:
+        return await self._read(-1)
+
+class EmbeddedGridFSBucket:
+    """
+    Substituto do GridFS no modo embutido: o conteúdo fica em arquivos no disco
+    e os metadados na coleção `<bucket>.files`, com os mesmos campos do GridFS
+    """
+
+    def __init__(self, database: EmbeddedDatabase, bucket_name: str = "fs", chunk_size_bytes: int = 255 * 1024):
+        self._files = database[f"{bucket_name}.files"]
+        self._chunk_size = chunk_size_bytes
+        default_root = database.client.path.parent / f"{database.client.path.stem}-{bucket_name}"
+        self._root = Path(os.environ.get("EMBEDDED_FILES_DIR", default_root))
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, file_id) -> Path:
+        return self._root / str(file_id)
+
+    async def upload_from_stream(self, filename: str, source, metadata: Optional[dict] = None, **kwargs):
+        data = source if isinstance(source, (bytes, bytearray)) else source.read()
+        file_id = uuid.uuid4().hex
+        path = self._path(file_id)
+
+        def write():
+            temp = path.with_suffix(".tmp")
+            temp.write_bytes(data)
+            temp.replace(path)
+
+        await asyncio.get_running_loop().run_in_executor(None, write)
+        await self._files.insert_one({
+            "_id": file_id,
+            "filename": filename,
+            "length": len(data),
+            "chunkSize": self._chunk_size,
+            "uploadDate": datetime.now(timezone.utc),
+            "metadata": metadata,
+        })
+        return file_id
+
+    async def open_download_stream_by_name(self, filename: str, revision: int = -1) -> EmbeddedGridOut:
+        file_doc = await self._files.find_one({"filename": filename}, sort=[("uploadDate", -1 if revision < 0 else 1)])
+        if file_doc is None:
+            raise NoFile(f"no file in gridfs with filename {filename!r}")
+        return EmbeddedGridOut(self._path(file_doc["_id"]), file_doc, self._chunk_size)
+
+    async def open_download_stream(self, file_id) -> EmbeddedGridOut:
+        file_doc = await self._files.find_one({"_id": file_id})
+        if file_doc is None:
+            raise NoFile(f"no file in gridfs with _id {file_id!r}")
+        return EmbeddedGridOut(self._path(file_id), file_doc, self._chunk_size)
+
+    async def delete(self, file_id):
+        deleted = await self._files.delete_one({"_id": file_id})
+        if not deleted.deleted_count:
+            raise NoFile(f"no file in gridfs with _id {file_id!r}")
+        self._path(file_id).unlink(missing_ok=True)
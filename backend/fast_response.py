@@ -0,0 +1,44 @@
+from fastapi import Response
+from pydantic import BaseModel
+from typing import Any, Dict, List, Type
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Caminho rápido das listagens (opcional): o banco devolve exatamente os campos do
+# modelo e o orjson serializa os documentos direto, sem validar cada um pelo Pydantic
+FAST_LIST_RESPONSES = os.environ.get("FAST_LIST_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    if FAST_LIST_RESPONSES:
+        logger.warning("FAST_LIST_RESPONSES ignorado: orjson não instalado")
+
+def fast_lists_enabled() -> bool:
+    return FAST_LIST_RESPONSES and orjson is not None
+
+def model_projection(model: Type[BaseModel]) -> Dict[str, int]:
+    """
+    Projeção com exatamente os campos do modelo de resposta
+    """
+    return {"_id": 0, **{field: 1 for field in model.model_fields}}
+
+def complete_defaults(docs: List[dict], model: Type[BaseModel]) -> List[dict]:
+    """
+    Preenche os campos opcionais ausentes com o padrão do modelo, como a validação faria.
+    Documentos gravados pelas rotas já têm todos os campos e passam direto.
+    """
+    defaults = {name: field.default for name, field in model.model_fields.items() if not field.is_required()}
+    size = len(model.model_fields)
+    for doc in docs:
+        if len(doc) != size:
+            for name, value in defaults.items():
+                doc.setdefault(name, value)
+    return docs
+
+def json_response(content: Any) -> Response:
+    # OPT_UTC_Z: datas em UTC saem com "Z", igual à serialização do Pydantic
+    return Response(orjson.dumps(content, option=orjson.OPT_UTC_Z), media_type="application/json")
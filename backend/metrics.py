@@ -0,0 +1,125 @@
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+import bisect
+import os
+
+# Métricas por rota (template do FastAPI, ex.: /api/students/{student_id}) no formato
+# texto do Prometheus. Tudo é atualizado no event loop pelo MetricsMiddleware; só as
+# chamadas ao banco chegam de outras threads, e cada uma mexe apenas na lista da
+# própria requisição (ver record_db_call).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+UNMATCHED_ROUTE = "unmatched"
+
+class RouteStats:
+    __slots__ = ("buckets", "count", "seconds", "response_bytes", "db_calls", "db_seconds")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.response_bytes = 0
+        self.db_calls = 0
+        self.db_seconds = 0.0
+
+requests_by_status: Dict[Tuple[str, str, int], int] = {}
+route_stats: Dict[Tuple[str, str], RouteStats] = {}
+in_flight = 0
+
+# [chamadas, segundos] ao banco da requisição atual; None fora de uma requisição
+_db_usage: ContextVar[Optional[List[float]]] = ContextVar("db_usage", default=None)
+
+def start_request() -> List[float]:
+    global in_flight
+    in_flight += 1
+    usage = [0, 0.0]
+    _db_usage.set(usage)
+    return usage
+
+def finish_request(method: str, route: str, status_code: int, seconds: float, response_bytes: int, usage: List[float]):
+    global in_flight
+    in_flight -= 1
+    key = (method, route, status_code)
+    requests_by_status[key] = requests_by_status.get(key, 0) + 1
+
+    stats = route_stats.get((method, route))
+    if stats is None:
+        stats = route_stats[(method, route)] = RouteStats()
+    stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    stats.count += 1
+    stats.seconds += seconds
+    stats.response_bytes += response_bytes
+    stats.db_calls += usage[0]
+    stats.db_seconds += usage[1]
+
+def record_db_call(seconds: float):
+    """
+    Soma uma chamada ao banco na requisição atual. Chamada pelo listener do
+    pymongo (na thread do Motor, que herda o contexto) ou pelo banco embutido.
+    """
+    usage = _db_usage.get()
+    if usage is not None:
+        usage[0] += 1
+        usage[1] += seconds
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+def _lines(name: str, kind: str, help_text: str, samples: Iterable[Tuple[str, float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for suffix_labels, value in samples:
+        lines.append(f"{name}{suffix_labels} {value}")
+    return lines
+
+def _histogram(stats: RouteStats, labels: str) -> Iterable[Tuple[str, float]]:
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), stats.buckets):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        yield f'_bucket{{{labels},le="{le}"}}', cumulative
+    yield f"_sum{{{labels}}}", stats.seconds
+    yield f"_count{{{labels}}}", stats.count
+
+def labeled(name: str, kind: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """
+    Uma métrica com rótulos arbitrários, ex.: labeled("x_total", "counter", "...", [({"a": "1"}, 3)])
+    """
+    return _lines(name, kind, help_text, ((f"{{{_labels(**labels)}}}", value) for labels, value in samples))
+
+def gauges(prefix: str, values: Dict[str, float], help_text: str) -> List[str]:
+    """
+    Estatísticas numéricas de um componente (ex.: cache de tokens) como gauges `prefix_chave`
+    """
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, (int, float)):
+            lines += _lines(f"{prefix}_{key}", "gauge", help_text, [("", value)])
+    return lines
+
+def render_metrics(extra: Iterable[str] = ()) -> str:
+    routes = sorted(route_stats.items())
+    lines = _lines(
+        "sge_http_requests_total", "counter", "Requisições HTTP por rota e status",
+        ((f"{{{_labels(method=m, route=r, status=s)}}}", count) for (m, r, s), count in sorted(requests_by_status.items())),
+    )
+    lines += ["# HELP sge_http_request_duration_seconds Latência das requisições HTTP por rota",
+              "# TYPE sge_http_request_duration_seconds histogram"]
+    for (method, route), stats in routes:
+        for suffix, value in _histogram(stats, _labels(method=method, route=route)):
+            lines.append(f"sge_http_request_duration_seconds{suffix} {value}")
+    lines += _lines(
+        "sge_http_response_bytes_total", "counter", "Bytes enviados no corpo das respostas por rota",
+        ((f"{{{_labels(method=m, route=r)}}}", stats.response_bytes) for (m, r), stats in routes),
+    )
+    lines += _lines(
+        "sge_db_calls_total", "counter", "Chamadas ao banco feitas pelas requisições de cada rota",
+        ((f"{{{_labels(method=m, route=r)}}}", stats.db_calls) for (m, r), stats in routes),
+    )
+    lines += _lines(
+        "sge_db_seconds_total", "counter", "Tempo gasto no banco pelas requisições de cada rota",
+        ((f"{{{_labels(method=m, route=r)}}}", stats.db_seconds) for (m, r), stats in routes),
+    )
+    lines += _lines("sge_http_requests_in_flight", "gauge", "Requisições HTTP em andamento", [("", in_flight)])
+    lines += list(extra)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,53 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import metrics
+import time
+
+class RemoveTrailingSlashMiddleware:
+    """
+    Middleware ASGI puro que remove a barra final do caminho ("/api/students/" -> "/api/students").
+    Altera apenas scope["path"], sem envolver a requisição nem a resposta.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            path = scope["path"]
+            if path != "/" and path.endswith("/"):
+                scope["path"] = path.rstrip("/") or "/"
+        await self.app(scope, receive, send)
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro que mede cada requisição HTTP (latência, status, bytes
+    da resposta e chamadas ao banco) por rota, sem envolver a resposta em memória.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        response_bytes = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        usage = metrics.start_request()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # O roteador do FastAPI grava a rota encontrada no próprio scope
+            route = getattr(scope.get("route"), "path", metrics.UNMATCHED_ROUTE)
+            metrics.finish_request(scope["method"], route, status_code, time.perf_counter() - started, response_bytes, usage)
@@ -0,0 +1,71 @@
+from database import db
+from datetime import datetime, timezone
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Campos de data que as rotas gravavam como texto ISO antes das datas nativas
+DATE_FIELDS = {
+    "users": ("created_at",),
+    "courses": ("created_at",),
+    "turmas": ("created_at",),
+    "students": ("created_at",),
+    "institution": ("updated_at",),
+    "jobs": ("created_at", "finished_at"),
+}
+MIGRATION_ID = "native_dates"
+BATCH_SIZE = 1000
+
+def _parse(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+async def _migrate_collection(name: str, fields: tuple) -> int:
+    from pymongo import UpdateOne
+
+    converted = 0
+    last_id = None
+    projection = {"_id": 1, **{field: 1 for field in fields}}
+    # Percorre por _id em lotes: nada de cursor aberto enquanto o lote é gravado
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        docs = await db[name].find(query, projection).sort("_id", 1).limit(BATCH_SIZE).to_list(BATCH_SIZE)
+        if not docs:
+            return converted
+        last_id = docs[-1]["_id"]
+
+        ops = []
+        for doc in docs:
+            update = {field: _parse(doc[field]) for field in fields if isinstance(doc.get(field), str)}
+            if update:
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        if ops:
+            await db[name].bulk_write(ops, ordered=False)
+            converted += len(ops)
+
+async def migrate_dates() -> dict:
+    """
+    Converte para datas nativas os campos de data gravados como texto.
+    Pode ser executada de novo sem efeito: só mexe no que ainda for texto.
+    """
+    converted = {name: await _migrate_collection(name, fields) for name, fields in DATE_FIELDS.items()}
+    await db.migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"applied_at": datetime.now(timezone.utc), "converted": converted}},
+        upsert=True
+    )
+    return converted
+
+async def ensure_native_dates():
+    """
+    Executa a migração uma única vez, na primeira inicialização depois da atualização
+    """
+    if await db.migrations.find_one({"_id": MIGRATION_ID}, {"_id": 1}):
+        return
+    converted = await migrate_dates()
+    if any(converted.values()):
+        logger.info(f"Datas convertidas para o formato nativo: {converted}")
+
+if __name__ == "__main__":
+    print(asyncio.run(migrate_dates()))
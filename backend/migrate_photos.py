@@ -0,0 +1,44 @@
+from dotenv import load_dotenv
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from database import db
+from photo_store import save_photo, decode_data_uri
+from fastapi import HTTPException
+import asyncio
+
+async def migrate_photos():
+    """
+    Move as fotos base64 gravadas inline em db.students para o GridFS,
+    deixando no aluno apenas o photo_id. Pode ser executado mais de uma vez.
+    """
+    print("Migrando fotos dos alunos para o GridFS...")
+    
+    migrated = 0
+    removed = 0
+    cursor = db.students.find({"photo": {"$exists": True}}, {"_id": 0, "id": 1, "photo": 1})
+    async for student in cursor:
+        photo_id = None
+        if student.get("photo"):
+            try:
+                content, content_type = decode_data_uri(student["photo"])
+                photo_id = await save_photo(content, content_type)
+            except HTTPException:
+                print(f"  ⚠ Foto inválida descartada para o aluno {student['id']}")
+        
+        await db.students.update_one(
+            {"id": student["id"]},
+            {"$set": {"photo_id": photo_id}, "$unset": {"photo": ""}}
+        )
+        if photo_id:
+            migrated += 1
+        else:
+            removed += 1
+    
+    print(f"✓ {migrated} fotos migradas")
+    print(f"✓ {removed} campos de foto vazios removidos")
+
+if __name__ == "__main__":
+    asyncio.run(migrate_photos())
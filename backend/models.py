@@ -32,6 +32,10 @@ class Token(BaseModel):
     token_type: str = "bearer"
     user: User
 
+class MediaToken(BaseModel):
+    access_token: str
+    expires_in: int
+
 class Institution(BaseModel):
     model_config = ConfigDict(extra="ignore")
     
@@ -109,13 +113,29 @@ class Student(BaseModel):
     email: Optional[EmailStr] = None
     phone: Optional[str] = None
     birth_date: Optional[str] = None
-    photo: Optional[str] = None
+    photo_id: Optional[str] = None
     turma_id: str
     turma_name: str
     course_name: str
     status: StudentStatus = StudentStatus.ACTIVE
     created_at: datetime
 
+class StudentPage(BaseModel):
+    items: List[Student]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+class StudentSort(str, Enum):
+    NAME = "name"
+    CREATED_AT = "created_at"
+    TURMA = "turma"
+    COURSE = "course"
+    STATUS = "status"
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
 class StudentCreate(BaseModel):
     name: str
     email: Optional[EmailStr] = None
@@ -133,6 +153,61 @@ class StudentUpdate(BaseModel):
     turma_id: Optional[str] = None
     status: Optional[StudentStatus] = None
 
+class StudentBatchOperation(str, Enum):
+    MOVE_TURMA = "move_turma"
+    SET_STATUS = "set_status"
+    DELETE = "delete"
+
+class StudentBatch(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=1000)
+    operation: StudentBatchOperation
+    turma_id: Optional[str] = None
+    status: Optional[StudentStatus] = None
+
+class StudentBatchItem(BaseModel):
+    id: str
+    ok: bool
+    error: Optional[str] = None
+
+class StudentBatchResult(BaseModel):
+    operation: StudentBatchOperation
+    processed: int
+    results: List[StudentBatchItem]
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    XLSX = "xlsx"
+    JSONL = "jsonl"
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ImportReport(BaseModel):
+    total_rows: int
+    imported: int
+    errors: List[ImportRowError]
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class Job(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    
+    id: str
+    kind: str
+    target_id: str
+    status: JobStatus
+    total_steps: int
+    done_steps: int
+    modified: dict
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
 class DashboardMetrics(BaseModel):
     total_students: int
     active_students: int
@@ -0,0 +1,63 @@
+from fastapi import HTTPException, status
+from datetime import datetime
+from typing import Any, List, Tuple
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def _encode_value(value):
+    # Datas vão marcadas para voltarem como datetime: comparar uma data BSON com texto não casa nada
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return str(value)
+
+# Tipos aceitos nos valores do cursor: qualquer outro (objetos, listas) viraria operador no filtro
+CURSOR_VALUE_TYPES = (str, int, float, bool, type(None), datetime)
+
+def _decode_value(obj: dict):
+    if set(obj) == {"$date"}:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Codifica os valores da chave de ordenação do último item da página
+    em um token opaco (base64 url-safe)
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=_encode_value).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")), object_hook=_decode_value)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        values = None
+
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(isinstance(value, CURSOR_VALUE_TYPES) for value in values)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido",
+        )
+    return values
+
+def keyset_filter(sort: List[Tuple[str, int]], values: List[Any]) -> dict:
+    """
+    Monta o filtro que retorna apenas documentos posteriores a `values`
+    na ordenação `sort` (paginação por chave, sem skip)
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+def cursor_values(doc: dict, sort: List[Tuple[str, int]]) -> List[Any]:
+    return [doc.get(field) for field, _ in sort]
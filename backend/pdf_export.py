@@ -0,0 +1,306 @@
+from fastapi import HTTPException
+from database import db
+from photo_store import read_photo
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import logging
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# Layout da grade (mm), o mesmo usado antes pelo jsPDF no PhotoGridPage
+PAGE_WIDTH = 210
+PAGE_HEIGHT = 297
+MARGIN = 15
+PHOTO_SIZE = 35
+PHOTO_GAP = 8
+TEXT_HEIGHT = 12
+ITEM_HEIGHT = PHOTO_SIZE + TEXT_HEIGHT + 5
+COLS = int((PAGE_WIDTH - 2 * MARGIN) // (PHOTO_SIZE + PHOTO_GAP))
+PDF_PHOTO_SIZE = 160
+STUDENT_BATCH_SIZE = 100
+
+PT_PER_MM = 72 / 25.4
+
+FONT_REGULAR = "F1"
+FONT_BOLD = "F2"
+
+# Larguras (1/1000 em) dos caracteres ASCII 32..126 das fontes padrão do PDF
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+_FONT_WIDTHS = {FONT_REGULAR: _HELVETICA_WIDTHS, FONT_BOLD: _HELVETICA_BOLD_WIDTHS}
+
+def _text_width(text: str, font: str, size: float) -> float:
+    widths = _FONT_WIDTHS[font]
+    total = 0
+    for char in text:
+        # Caracteres acentuados usam a largura da letra base
+        base = unicodedata.normalize("NFD", char)[0]
+        code = ord(base)
+        total += widths[code - 32] if 32 <= code <= 126 else 556
+    return total * size / 1000
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+def _jpeg_info(data: bytes) -> Tuple[int, int, int]:
+    """
+    Lê largura, altura e número de componentes do marcador SOF do JPEG
+    """
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in (0xD8, 0x01, 0xFF) or 0xD0 <= marker <= 0xD7:
+            i += 2 if marker != 0xFF else 1
+            continue
+        length = int.from_bytes(data[i + 2:i + 4], "big")
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return width, height, data[i + 9]
+        i += 2 + length
+    raise ValueError("JPEG inválido")
+
+class PageCanvas:
+    """
+    Acumula os operadores de desenho de uma página. As coordenadas são em mm
+    com origem no canto superior esquerdo, como no jsPDF.
+    """
+
+    def __init__(self):
+        self.ops: List[bytes] = []
+        self.images: List[Tuple[str, bytes, int, int, int]] = []
+
+    @staticmethod
+    def _x(mm: float) -> float:
+        return mm * PT_PER_MM
+
+    @staticmethod
+    def _y(mm: float) -> float:
+        return (PAGE_HEIGHT - mm) * PT_PER_MM
+
+    def text(self, text: str, x: float, y: float, font: str, size: float,
+             align: str = "left", gray: float = 0):
+        x_pt = self._x(x)
+        width = _text_width(text, font, size)
+        if align == "center":
+            x_pt -= width / 2
+        elif align == "right":
+            x_pt -= width
+        self.ops.append(
+            b"BT /%s %.2f Tf %.3f g %.2f %.2f Td %s Tj ET"
+            % (font.encode(), size, gray, x_pt, self._y(y), _pdf_string(text))
+        )
+
+    def rounded_rect(self, x: float, y: float, w: float, h: float, r: float,
+                     stroke: Tuple[float, float, float], fill: Tuple[float, float, float]):
+        x0, y1 = self._x(x), self._y(y)
+        x1, y0 = self._x(x + w), self._y(y + h)
+        r = r * PT_PER_MM
+        k = r * 0.5523
+        path = [
+            b"%.2f %.2f m" % (x0 + r, y0),
+            b"%.2f %.2f l" % (x1 - r, y0),
+            b"%.2f %.2f %.2f %.2f %.2f %.2f c" % (x1 - r + k, y0, x1, y0 + r - k, x1, y0 + r),
+            b"%.2f %.2f l" % (x1, y1 - r),
+            b"%.2f %.2f %.2f %.2f %.2f %.2f c" % (x1, y1 - r + k, x1 - r + k, y1, x1 - r, y1),
+            b"%.2f %.2f l" % (x0 + r, y1),
+            b"%.2f %.2f %.2f %.2f %.2f %.2f c" % (x0 + r - k, y1, x0, y1 - r + k, x0, y1 - r),
+            b"%.2f %.2f l" % (x0, y0 + r),
+            b"%.2f %.2f %.2f %.2f %.2f %.2f c" % (x0, y0 + r - k, x0 + r - k, y0, x0 + r, y0),
+        ]
+        self.ops.append(b"%.3f %.3f %.3f RG %.3f %.3f %.3f rg 0.57 w " % (*stroke, *fill) + b" ".join(path) + b" B")
+
+    def image(self, jpeg: bytes, x: float, y: float, box: float):
+        """
+        Desenha o JPEG centralizado em um quadrado de `box` mm, mantendo a proporção
+        """
+        width, height, components = _jpeg_info(jpeg)
+        scale = box / max(width, height)
+        w, h = width * scale, height * scale
+        x += (box - w) / 2
+        y += (box - h) / 2
+        name = f"Im{len(self.images)}"
+        self.images.append((name, jpeg, width, height, components))
+        self.ops.append(
+            b"q %.2f 0 0 %.2f %.2f %.2f cm /%s Do Q"
+            % (w * PT_PER_MM, h * PT_PER_MM, self._x(x), self._y(y + h), name.encode())
+        )
+
+class StreamingPdfWriter:
+    """
+    Escritor PDF mínimo que emite cada página assim que ela é finalizada.
+    A árvore de páginas e a tabela xref vão no final do arquivo.
+    """
+
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self):
+        self._offset = 0
+        self._xref: Dict[int, int] = {}
+        self._next_id = 3
+        self._page_ids: List[int] = []
+        self._font_ids: Dict[str, int] = {}
+
+    def _new_id(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _emit(self, data: bytes) -> bytes:
+        self._offset += len(data)
+        return data
+
+    def _object(self, obj_id: int, body: bytes, stream: Optional[bytes] = None) -> bytes:
+        self._xref[obj_id] = self._offset
+        data = b"%d 0 obj\n" % obj_id + body
+        if stream is not None:
+            data += b"\nstream\n" + stream + b"\nendstream"
+        return self._emit(data + b"\nendobj\n")
+
+    def begin(self) -> bytes:
+        chunks = [self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")]
+        for font, base_font in ((FONT_REGULAR, b"Helvetica"), (FONT_BOLD, b"Helvetica-Bold")):
+            obj_id = self._new_id()
+            self._font_ids[font] = obj_id
+            chunks.append(self._object(
+                obj_id,
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base_font,
+            ))
+        return b"".join(chunks)
+
+    def add_page(self, canvas: PageCanvas) -> bytes:
+        chunks = []
+        xobjects = []
+        for name, jpeg, width, height, components in canvas.images:
+            obj_id = self._new_id()
+            color_space = {1: b"DeviceGray", 4: b"DeviceCMYK"}.get(components, b"DeviceRGB")
+            chunks.append(self._object(
+                obj_id,
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /%s "
+                b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>"
+                % (width, height, color_space, len(jpeg)),
+                jpeg,
+            ))
+            xobjects.append(b"/%s %d 0 R" % (name.encode(), obj_id))
+
+        content = b"\n".join(canvas.ops)
+        content_id = self._new_id()
+        chunks.append(self._object(content_id, b"<< /Length %d >>" % len(content), content))
+
+        fonts = b" ".join(b"/%s %d 0 R" % (font.encode(), obj_id) for font, obj_id in self._font_ids.items())
+        page_id = self._new_id()
+        self._page_ids.append(page_id)
+        chunks.append(self._object(
+            page_id,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] "
+            b"/Resources << /Font << %s >> /XObject << %s >> >> /Contents %d 0 R >>"
+            % (self.PAGES_ID, PAGE_WIDTH * PT_PER_MM, PAGE_HEIGHT * PT_PER_MM,
+               fonts, b" ".join(xobjects), content_id),
+        ))
+        return b"".join(chunks)
+
+    def finish(self) -> bytes:
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self._page_ids)
+        chunks = [
+            self._object(self.PAGES_ID, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_ids))),
+            self._object(self.CATALOG_ID, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES_ID),
+        ]
+        xref_offset = self._offset
+        size = self._next_id
+        xref = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            xref.append(b"%010d 00000 n \n" % self._xref[obj_id])
+        xref.append(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, self.CATALOG_ID, xref_offset))
+        chunks.append(self._emit(b"".join(xref)))
+        return b"".join(chunks)
+
+def _draw_initial(canvas: PageCanvas, name: str, x: float, y: float):
+    canvas.text(name[:1].upper(), x + PHOTO_SIZE / 2, y + PHOTO_SIZE / 2 + 5, FONT_BOLD, 24,
+                align="center", gray=100 / 255)
+
+async def _draw_photo(canvas: PageCanvas, student: dict, x: float, y: float) -> bool:
+    """
+    Desenha a miniatura do aluno; False se ele não tiver foto ou se ela não puder
+    ser lida. Como as primeiras páginas já foram enviadas, um erro aqui não pode
+    interromper o PDF: o aluno fica com a inicial no lugar da foto.
+    """
+    if not student.get("photo_id"):
+        return False
+    try:
+        photo = await read_photo(student["photo_id"], PDF_PHOTO_SIZE)
+        if photo:
+            canvas.image(photo, x + 2, y + 2, PHOTO_SIZE - 4)
+            return True
+    except (HTTPException, ValueError) as e:
+        logger.warning(f"Foto do aluno {student['id']} ignorada no PDF: {getattr(e, 'detail', e)}")
+    return False
+
+async def photo_grid_pdf(turmas: List[dict]) -> AsyncIterator[bytes]:
+    """
+    Gera o PDF da grade de fotos, uma seção por turma, emitindo cada página
+    assim que ela fica pronta. Usa as miniaturas já armazenadas no GridFS.
+    """
+    writer = StreamingPdfWriter()
+    yield writer.begin()
+
+    generated_at = datetime.now().strftime("%d/%m/%Y")
+    for turma in turmas:
+        total = await db.students.count_documents({"turma_id": turma["id"]})
+
+        canvas = PageCanvas()
+        canvas.text(turma["name"], PAGE_WIDTH / 2, MARGIN + 5, FONT_BOLD, 20, align="center")
+        canvas.text(f"Total de alunos: {total}", PAGE_WIDTH / 2, MARGIN + 12, FONT_REGULAR, 10, align="center")
+        canvas.text(f"Gerado em: {generated_at}", PAGE_WIDTH - MARGIN, PAGE_HEIGHT - 10, FONT_REGULAR, 8, align="right")
+
+        x, y, col = MARGIN, MARGIN + 20, 0
+        students = db.students.find(
+            {"turma_id": turma["id"]},
+            {"_id": 0, "id": 1, "name": 1, "photo_id": 1}
+        ).sort([("name", 1), ("id", 1)]).batch_size(STUDENT_BATCH_SIZE)
+
+        async for student in students:
+            if y + ITEM_HEIGHT > PAGE_HEIGHT - MARGIN:
+                yield writer.add_page(canvas)
+                canvas = PageCanvas()
+                x, y, col = MARGIN, MARGIN + 10, 0
+
+            canvas.rounded_rect(x, y, PHOTO_SIZE, PHOTO_SIZE, 3,
+                                stroke=(200 / 255,) * 3, fill=(245 / 255,) * 3)
+
+            if not await _draw_photo(canvas, student, x, y):
+                _draw_initial(canvas, student["name"], x, y)
+
+            name = student["name"]
+            if len(name) > 18:
+                name = name[:16] + "..."
+            canvas.text(name, x + PHOTO_SIZE / 2, y + PHOTO_SIZE + 6, FONT_REGULAR, 8, align="center")
+
+            col += 1
+            if col >= COLS:
+                x, y, col = MARGIN, y + ITEM_HEIGHT, 0
+            else:
+                x += PHOTO_SIZE + PHOTO_GAP
+
+        yield writer.add_page(canvas)
+
+    yield writer.finish()
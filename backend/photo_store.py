@@ -0,0 +1,166 @@
+from fastapi import HTTPException, status
+from database import db, EMBEDDED
+from thumbnails import PHOTO_SIZES, VARIANT_CONTENT_TYPE, generate_variants
+from typing import AsyncIterator, Optional, Tuple
+import base64
+import binascii
+import hashlib
+import re
+
+PHOTO_BUCKET = "photos"
+CHUNK_SIZE = 255 * 1024
+
+_DATA_URI_RE = re.compile(r"^data:(?P<content_type>image/[\w.+-]+);base64,(?P<data>.+)$", re.DOTALL)
+
+if EMBEDDED:
+    # No modo embutido as fotos ficam em arquivos ao lado do banco SQLite
+    from embedded_db import EmbeddedGridFSBucket as PhotoBucket, NoFile
+else:
+    from motor.motor_asyncio import AsyncIOMotorGridFSBucket as PhotoBucket
+    from gridfs.errors import NoFile
+
+photos_bucket = PhotoBucket(db, bucket_name=PHOTO_BUCKET, chunk_size_bytes=CHUNK_SIZE)
+
+def decode_data_uri(data_uri: str) -> Tuple[bytes, str]:
+    """
+    Converte o data URI base64 enviado pelo frontend em bytes + content type
+    """
+    match = _DATA_URI_RE.match(data_uri.strip())
+    if not match:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Foto inválida",
+        )
+    try:
+        content = base64.b64decode(match.group("data"), validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Foto inválida",
+        )
+    return content, match.group("content_type")
+
+def variant_name(photo_id: str, size: int) -> str:
+    return f"{photo_id}@{size}"
+
+async def _store_variants(photo_id: str, content: bytes):
+    try:
+        variants = await generate_variants(content)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Foto inválida",
+        )
+    for size, data in variants.items():
+        await photos_bucket.upload_from_stream(
+            variant_name(photo_id, size),
+            data,
+            metadata={"content_type": VARIANT_CONTENT_TYPE, "variant_of": photo_id, "size": size},
+        )
+
+async def save_photo(content: bytes, content_type: str) -> str:
+    """
+    Grava a foto no GridFS endereçada pelo SHA-256 do conteúdo, junto com as
+    miniaturas de cada tamanho em PHOTO_SIZES. Fotos idênticas são armazenadas uma única vez.
+    """
+    photo_id = hashlib.sha256(content).hexdigest()
+    existing = await db[f"{PHOTO_BUCKET}.files"].find_one({"filename": photo_id}, {"_id": 1})
+    if not existing:
+        # As miniaturas são geradas antes para que uma imagem inválida não seja gravada
+        await _store_variants(photo_id, content)
+        await photos_bucket.upload_from_stream(
+            photo_id,
+            content,
+            metadata={"content_type": content_type},
+        )
+    return photo_id
+
+async def save_photo_data_uri(data_uri: str) -> str:
+    content, content_type = decode_data_uri(data_uri)
+    return await save_photo(content, content_type)
+
+async def migrate_inline_photo(student_id: str, data_uri: str) -> Optional[str]:
+    """
+    Move a foto base64 de versões antigas (campo `photo` do aluno) para o
+    GridFS, com miniaturas, e devolve o photo_id; None se a imagem for inválida
+    """
+    try:
+        photo_id = await save_photo_data_uri(data_uri)
+    except HTTPException:
+        return None
+    result = await db.students.update_one(
+        {"id": student_id, "photo": data_uri},
+        {"$set": {"photo_id": photo_id}, "$unset": {"photo": ""}}
+    )
+    if not result.modified_count:
+        # O aluno mudou nesse meio tempo; não deixa a foto órfã
+        await release_photo(photo_id)
+        return None
+    return photo_id
+
+async def _open_variant(photo_id: str, size: int):
+    try:
+        return await photos_bucket.open_download_stream_by_name(variant_name(photo_id, size))
+    except NoFile:
+        pass
+
+    # Fotos gravadas antes das miniaturas: gera sob demanda a partir do original
+    try:
+        original = await photos_bucket.open_download_stream_by_name(photo_id)
+    except NoFile:
+        return None
+    await _store_variants(photo_id, await original.read())
+    return await photos_bucket.open_download_stream_by_name(variant_name(photo_id, size))
+
+async def open_photo(photo_id: str, size: Optional[int] = None) -> Optional[Tuple[AsyncIterator[bytes], str, int]]:
+    """
+    Retorna (iterador de chunks, content type, tamanho) do original ou da
+    miniatura `size`, ou None se a foto não existir
+    """
+    if size is not None and size not in PHOTO_SIZES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tamanho inválido. Use um de: {', '.join(map(str, PHOTO_SIZES))}",
+        )
+
+    if size is None:
+        try:
+            grid_out = await photos_bucket.open_download_stream_by_name(photo_id)
+        except NoFile:
+            return None
+    else:
+        grid_out = await _open_variant(photo_id, size)
+        if grid_out is None:
+            return None
+
+    async def chunks():
+        while True:
+            chunk = await grid_out.readchunk()
+            if not chunk:
+                break
+            yield chunk
+
+    content_type = (grid_out.metadata or {}).get("content_type", "application/octet-stream")
+    return chunks(), content_type, grid_out.length
+
+async def read_photo(photo_id: str, size: Optional[int] = None) -> Optional[bytes]:
+    stored = await open_photo(photo_id, size)
+    if stored is None:
+        return None
+    chunks, _, _ = stored
+    return b"".join([chunk async for chunk in chunks])
+
+async def release_photo(photo_id: Optional[str]):
+    """
+    Remove a foto e suas miniaturas do GridFS quando nenhum aluno a referencia mais
+    """
+    if not photo_id:
+        return
+    if await db.students.count_documents({"photo_id": photo_id}, limit=1):
+        return
+    files = db[f"{PHOTO_BUCKET}.files"].find(
+        {"$or": [{"filename": photo_id}, {"metadata.variant_of": photo_id}]},
+        {"_id": 1}
+    )
+    async for file_doc in files:
+        await photos_bucket.delete(file_doc["_id"])
@@ -0,0 +1,65 @@
+from typing import Dict, List
+import threading
+
+# Contadores por servidor e a descrição de cada um; os que terminam em _total só crescem
+POOL_FIELDS = {
+    "max_size": "Tamanho máximo do pool de conexões do MongoDB",
+    "open": "Conexões abertas com o MongoDB",
+    "checked_out": "Conexões do MongoDB em uso",
+    "wait_queue": "Operações esperando uma conexão livre do MongoDB",
+    "connections_created_total": "Conexões criadas com o MongoDB",
+    "checkouts_total": "Conexões do MongoDB retiradas do pool",
+    "checkout_failures_total": "Falhas ao obter uma conexão do MongoDB (timeout ou erro de conexão)",
+    "cleared_total": "Vezes que o pool foi esvaziado após erro de rede",
+}
+
+# Os eventos chegam das threads do Motor; pool_stats é protegido por _lock
+_lock = threading.Lock()
+pool_stats: Dict[str, Dict[str, int]] = {}
+
+def _address(address) -> str:
+    host, port = address
+    return f"{host}:{port}"
+
+def _update(address, **deltas):
+    with _lock:
+        stats = pool_stats.setdefault(_address(address), dict.fromkeys(POOL_FIELDS, 0))
+        for field, delta in deltas.items():
+            stats[field] += delta
+
+def pool_created(address, max_size: int):
+    with _lock:
+        stats = pool_stats.setdefault(_address(address), dict.fromkeys(POOL_FIELDS, 0))
+        stats["max_size"] = max_size
+
+def pool_closed(address):
+    with _lock:
+        pool_stats.pop(_address(address), None)
+
+def pool_cleared(address):
+    _update(address, cleared_total=1)
+
+def connection_created(address):
+    _update(address, open=1, connections_created_total=1)
+
+def connection_closed(address):
+    _update(address, open=-1)
+
+def checkout_started(address):
+    _update(address, wait_queue=1)
+
+def checked_out(address):
+    _update(address, wait_queue=-1, checked_out=1, checkouts_total=1)
+
+def checkout_failed(address):
+    _update(address, wait_queue=-1, checkout_failures_total=1)
+
+def checked_in(address):
+    _update(address, checked_out=-1)
+
+def pool_summary() -> List[dict]:
+    """
+    Estado do pool de conexões de cada servidor: abertas, em uso, esperando na fila
+    """
+    with _lock:
+        return [{"address": address, **stats} for address, stats in pool_stats.items()]
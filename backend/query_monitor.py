@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Comandos acima deste tempo vão para o log e para o ranking das consultas mais lentas
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 100))
+SLOW_QUERY_TOP_N = int(os.environ.get("SLOW_QUERY_TOP_N", 20))
+
+# Onde cada comando do MongoDB leva o filtro
+FILTER_FIELDS = {"find": "filter", "count": "query", "distinct": "query", "findAndModify": "query", "aggregate": "pipeline"}
+
+# Os eventos chegam das threads do Motor; tudo abaixo é protegido por _lock
+_lock = threading.Lock()
+_pending: Dict[Tuple[Any, int], Tuple[str, str, dict]] = {}
+command_stats: Dict[Tuple[str, str], Dict[str, float]] = {}
+_slow_shapes: Dict[str, dict] = {}
+
+def redact(value):
+    """
+    Formato do filtro sem os valores: mantém campos e operadores, troca valores por "?"
+    ({"turma_id": "abc", "status": {"$in": ["a", "b"]}} -> {"turma_id": "?", "status": {"$in": "?"}})
+    """
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and any(isinstance(item, dict) for item in value):
+        return [redact(item) for item in value]
+    # Referências a campos nos estágios de agregação ("$course_name") não são dados
+    if isinstance(value, str) and value.startswith("$"):
+        return value
+    return "?"
+
+def _collection(name: str, command: dict) -> Optional[str]:
+    collection = command.get("collection") if name == "getMore" else command.get(name)
+    return collection if isinstance(collection, str) else None
+
+def _filter(name: str, command: dict):
+    if name in ("update", "delete"):
+        statements = command.get(f"{name}s") or [{}]
+        return statements[0].get("q")
+    return command.get(FILTER_FIELDS.get(name, ""))
+
+def command_shape(name: str, command: dict) -> dict:
+    shape = {"filter": redact(_filter(name, command) or {})}
+    if command.get("sort"):
+        shape["sort"] = dict(command["sort"])
+    return shape
+
+def command_started(connection_id, request_id: int, name: str, command: dict):
+    collection = _collection(name, command)
+    if collection is None:
+        return
+    with _lock:
+        _pending[(connection_id, request_id)] = (name, collection, command)
+
+def command_finished(connection_id, request_id: int, seconds: float):
+    with _lock:
+        started = _pending.pop((connection_id, request_id), None)
+        if started is None:
+            return
+        name, collection, command = started
+        stats = command_stats.get((name, collection))
+        if stats is None:
+            stats = command_stats[(name, collection)] = {"count": 0, "seconds_total": 0.0, "seconds_max": 0.0}
+        stats["count"] += 1
+        stats["seconds_total"] += seconds
+        stats["seconds_max"] = max(stats["seconds_max"], seconds)
+
+    milliseconds = seconds * 1000
+    if milliseconds < SLOW_QUERY_MS:
+        return
+
+    shape = command_shape(name, command)
+    logger.warning(f"Consulta lenta ({milliseconds:.0f} ms): {name} {collection} {shape}")
+    key = json.dumps([name, collection, shape], default=str)
+    with _lock:
+        entry = _slow_shapes.get(key)
+        if entry is None:
+            entry = _slow_shapes[key] = {"command": name, "collection": collection, "shape": shape, "count": 0, "ms_total": 0.0, "ms_max": 0.0}
+        entry["count"] += 1
+        entry["ms_total"] += milliseconds
+        entry["ms_max"] = max(entry["ms_max"], milliseconds)
+        entry["last_seen"] = datetime.now(timezone.utc)
+        # Memória limitada: de tempos em tempos fica só o top-N
+        if len(_slow_shapes) > SLOW_QUERY_TOP_N * 4:
+            for stale in sorted(_slow_shapes, key=lambda k: _slow_shapes[k]["ms_max"])[:-SLOW_QUERY_TOP_N]:
+                del _slow_shapes[stale]
+
+def slowest_queries() -> List[dict]:
+    with _lock:
+        entries = sorted(_slow_shapes.values(), key=lambda entry: entry["ms_max"], reverse=True)[:SLOW_QUERY_TOP_N]
+        return [dict(entry) for entry in entries]
+
+def command_summary() -> List[dict]:
+    with _lock:
+        rows = [{"command": name, "collection": collection, **stats} for (name, collection), stats in command_stats.items()]
+    return sorted(rows, key=lambda row: row["seconds_total"], reverse=True)
+
+def reset():
+    with _lock:
+        command_stats.clear()
+        _slow_shapes.clear()
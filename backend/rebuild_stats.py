@@ -0,0 +1,18 @@
+from dotenv import load_dotenv
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from stats import rebuild_stats, get_stats
+import asyncio
+
+async def main():
+    print("Recalculando contadores de alunos...")
+    await rebuild_stats()
+    stats = await get_stats()
+    print(f"✓ {len(stats['course'])} cursos, {len(stats['turma'])} turmas, {len(stats['status'])} status")
+    print(f"✓ Total de alunos: {sum(stats['status'].values())}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
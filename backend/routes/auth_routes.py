@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from models import UserLogin, Token, User, UserCreate, UserRole
-from auth import verify_password, create_access_token, get_password_hash, get_current_user
+from models import UserLogin, Token, MediaToken, User, UserCreate, UserRole
+from auth import verify_password_async, create_access_token, create_media_token, get_password_hash_async, get_current_user, get_current_admin_user, get_password_pool_stats, token_cache, JWT_BACKEND
 from database import db
 from datetime import datetime, timezone
+import time
 import uuid
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -11,7 +12,7 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 async def login(credentials: UserLogin):
     user_doc = await db.users.find_one({"email": credentials.email}, {"_id": 0})
     
-    if not user_doc or not verify_password(credentials.password, user_doc["password"]):
+    if not user_doc or not await verify_password_async(credentials.password, user_doc["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
@@ -28,9 +29,6 @@ async def login(credentials: UserLogin):
     )
     
     user_doc.pop("password", None)
-    if isinstance(user_doc['created_at'], str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-    
     return Token(
         access_token=access_token,
         user=User(**user_doc)
@@ -46,11 +44,29 @@ async def get_me(current_user: dict = Depends(get_current_user)):
             detail="Usuário não encontrado",
         )
     
-    if isinstance(user_doc['created_at'], str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-    
     return User(**user_doc)
 
+@router.post("/media-token", response_model=MediaToken)
+async def get_media_token(current_user: dict = Depends(get_current_user)):
+    """
+    Token que só permite ler fotos, para usar na URL das imagens; é o mesmo
+    durante toda a sessão e expira junto com ela
+    """
+    return MediaToken(
+        access_token=create_media_token(current_user),
+        expires_in=max(int(current_user["exp"] - time.time()), 0),
+    )
+
+@router.get("/stats")
+async def get_auth_stats(current_user: dict = Depends(get_current_admin_user)):
+    """
+    Acertos e falhas do cache de tokens e fila do pool de hashing de senhas
+    """
+    return {
+        "token_cache": {"backend": JWT_BACKEND, **token_cache.stats()},
+        "password_pool": get_password_pool_stats(),
+    }
+
 @router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate):
     existing_user = await db.users.find_one({"email": user_data.email})
@@ -62,13 +78,12 @@ async def register(user_data: UserCreate):
     
     user_dict = user_data.model_dump()
     user_dict["id"] = str(uuid.uuid4())
-    user_dict["password"] = get_password_hash(user_data.password)
+    user_dict["password"] = await get_password_hash_async(user_data.password)
     user_dict["active"] = True
-    user_dict["created_at"] = datetime.now(timezone.utc).isoformat()
+    user_dict["created_at"] = datetime.now(timezone.utc)
     
     await db.users.insert_one(user_dict)
     
     user_dict.pop("password")
-    user_dict['created_at'] = datetime.fromisoformat(user_dict['created_at'])
     
     return User(**user_dict)
\ No newline at end of file
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from models import Course, CourseCreate, CourseUpdate
+from fastapi import APIRouter, HTTPException, status, Depends, Response
+from models import Course, CourseCreate, CourseUpdate, ExportFormat
 from auth import get_current_user, get_current_admin_user
 from database import db
+from fast_response import fast_lists_enabled, model_projection, complete_defaults, json_response
+from cache import dashboard_cache
+from cascade import start_cascade
+from data_export import COURSE_COLUMNS, export_response, projection
 from datetime import datetime, timezone
 from typing import List
 import uuid
@@ -13,23 +17,28 @@ async def create_course(course_data: CourseCreate, current_user: dict = Depends(
     course_dict = course_data.model_dump()
     course_dict["id"] = str(uuid.uuid4())
     course_dict["active"] = True
-    course_dict["created_at"] = datetime.now(timezone.utc).isoformat()
+    course_dict["created_at"] = datetime.now(timezone.utc)
     
     await db.courses.insert_one(course_dict)
+    dashboard_cache.invalidate()
     
-    course_dict['created_at'] = datetime.fromisoformat(course_dict['created_at'])
     return Course(**course_dict)
 
 @router.get("", response_model=List[Course])
 async def get_courses(current_user: dict = Depends(get_current_user)):
-    courses = await db.courses.find({}, {"_id": 0}).to_list(1000)
+    if fast_lists_enabled():
+        courses = await db.courses.find({}, model_projection(Course)).to_list(1000)
+        return json_response(complete_defaults(courses, Course))
     
-    for course in courses:
-        if isinstance(course['created_at'], str):
-            course['created_at'] = datetime.fromisoformat(course['created_at'])
+    courses = await db.courses.find({}, {"_id": 0}).to_list(1000)
     
     return courses
 
+@router.get("/export")
+async def export_courses(format: ExportFormat = ExportFormat.CSV, current_user: dict = Depends(get_current_user)):
+    cursor = db.courses.find({}, projection(COURSE_COLUMNS)).sort("name", 1)
+    return export_response(cursor, COURSE_COLUMNS, format, "cursos")
+
 @router.get("/{course_id}", response_model=Course)
 async def get_course(course_id: str, current_user: dict = Depends(get_current_user)):
     course_doc = await db.courses.find_one({"id": course_id}, {"_id": 0})
@@ -39,36 +48,40 @@ async def get_course(course_id: str, current_user: dict = Depends(get_current_us
             detail="Curso não encontrado",
         )
     
-    if isinstance(course_doc['created_at'], str):
-        course_doc['created_at'] = datetime.fromisoformat(course_doc['created_at'])
-    
     return Course(**course_doc)
 
 @router.put("/{course_id}", response_model=Course)
 async def update_course(
     course_id: str,
     course_data: CourseUpdate,
+    response: Response,
     current_user: dict = Depends(get_current_admin_user)
 ):
-    existing_course = await db.courses.find_one({"id": course_id})
+    update_data = course_data.model_dump(exclude_unset=True)
+    
+    # Uma ida ao banco: o documento anterior decide a propagação e o novo é ele + update_data
+    if update_data:
+        existing_course = await db.courses.find_one_and_update({"id": course_id}, {"$set": update_data}, {"_id": 0})
+    else:
+        existing_course = await db.courses.find_one({"id": course_id}, {"_id": 0})
     if not existing_course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Curso não encontrado",
         )
+    dashboard_cache.invalidate()
     
-    update_data = course_data.model_dump(exclude_unset=True)
-    await db.courses.update_one({"id": course_id}, {"$set": update_data})
-    
-    updated_course = await db.courses.find_one({"id": course_id}, {"_id": 0})
-    if isinstance(updated_course['created_at'], str):
-        updated_course['created_at'] = datetime.fromisoformat(updated_course['created_at'])
+    # Turmas e alunos guardam o nome do curso; a propagação roda em segundo plano
+    if update_data.get("name", existing_course["name"]) != existing_course["name"]:
+        response.headers["X-Job-Id"] = await start_cascade("course", course_id)
     
+    updated_course = {**existing_course, **update_data}
     return Course(**updated_course)
 
 @router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_course(course_id: str, current_user: dict = Depends(get_current_admin_user)):
     result = await db.courses.delete_one({"id": course_id})
+    dashboard_cache.invalidate()
     if result.deleted_count == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -19,14 +19,11 @@ async def get_institution(current_user: dict = Depends(get_current_user)):
             "phone": None,
             "email": "admin@escola.com",  # Default valid email
             "logo": None,
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         }
         await db.institution.insert_one(default_institution)
         institution = default_institution
     
-    if isinstance(institution['updated_at'], str):
-        institution['updated_at'] = datetime.fromisoformat(institution['updated_at'])
-    
     return Institution(**institution)
 
 @router.put("", response_model=Institution)
@@ -34,20 +31,17 @@ async def update_institution(
     institution_data: InstitutionUpdate,
     current_user: dict = Depends(get_current_admin_user)
 ):
-    existing = await db.institution.find_one({}, {"_id": 0})
-    
-    if not existing:
-        institution_dict = institution_data.model_dump()
-        institution_dict["id"] = str(uuid.uuid4())
-        institution_dict["updated_at"] = datetime.now(timezone.utc).isoformat()
-        await db.institution.insert_one(institution_dict)
-    else:
-        update_data = institution_data.model_dump()
-        update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-        await db.institution.update_one({"id": existing["id"]}, {"$set": update_data})
+    from pymongo import ReturnDocument
     
-    updated_institution = await db.institution.find_one({}, {"_id": 0})
-    if isinstance(updated_institution['updated_at'], str):
-        updated_institution['updated_at'] = datetime.fromisoformat(updated_institution['updated_at'])
+    update_data = institution_data.model_dump()
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
+    # Cria o registro na primeira gravação; atualização e leitura numa única ida ao banco
+    updated_institution = await db.institution.find_one_and_update(
+        {},
+        {"$set": update_data, "$setOnInsert": {"id": str(uuid.uuid4())}},
+        {"_id": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
     return Institution(**updated_institution)
\ No newline at end of file
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from models import Job
+from auth import get_current_user
+from database import db
+from typing import List
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("", response_model=List[Job])
+async def get_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    return await db.jobs.find({}, {"_id": 0}).sort("created_at", -1).to_list(limit)
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado",
+        )
+    return job
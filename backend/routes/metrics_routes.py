@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import PlainTextResponse
+from metrics import METRICS_TOKEN, gauges, labeled, render_metrics
+from auth import token_cache, get_password_pool_stats, get_current_user, get_current_admin_user, optional_security
+from typing import Optional
+from query_monitor import SLOW_QUERY_MS, SLOW_QUERY_TOP_N, command_summary, slowest_queries, reset
+from pool_monitor import POOL_FIELDS, pool_summary
+import secrets
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+async def metrics_access(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)) -> Optional[dict]:
+    """
+    Exige um administrador autenticado ou, para coletores como o Prometheus,
+    `Authorization: Bearer <METRICS_TOKEN>` quando METRICS_TOKEN está definido
+    (nesse caso não há usuário e devolve None)
+    """
+    if not credentials:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não autenticado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if METRICS_TOKEN and secrets.compare_digest(credentials.credentials.encode(), METRICS_TOKEN.encode()):
+        return None
+    return await get_current_admin_user(await get_current_user(credentials))
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(current_user: Optional[dict] = Depends(metrics_access)):
+    """
+    Métricas no formato texto do Prometheus (ver metrics_access)
+    """
+    commands = command_summary()
+    extra = gauges("sge_token_cache", token_cache.stats(), "Cache de tokens JWT verificados")
+    extra += gauges("sge_password_pool", get_password_pool_stats(), "Pool de threads do bcrypt")
+    extra += labeled(
+        "sge_db_commands_total", "counter", "Comandos enviados ao MongoDB por tipo e coleção",
+        (({"command": row["command"], "collection": row["collection"]}, row["count"]) for row in commands),
+    )
+    extra += labeled(
+        "sge_db_command_seconds_total", "counter", "Tempo dos comandos no MongoDB por tipo e coleção",
+        (({"command": row["command"], "collection": row["collection"]}, row["seconds_total"]) for row in commands),
+    )
+    pools = pool_summary()
+    for field, help_text in POOL_FIELDS.items():
+        extra += labeled(
+            f"sge_db_pool_{field}", "counter" if field.endswith("_total") else "gauge", help_text,
+            (({"address": pool["address"]}, pool[field]) for pool in pools),
+        )
+    return PlainTextResponse(render_metrics(extra), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@router.get("/metrics/queries")
+async def get_query_stats(current_user: dict = Depends(get_current_admin_user)):
+    """
+    Tempo por comando e coleção e as consultas mais lentas (filtros sem os valores)
+    """
+    return {
+        "threshold_ms": SLOW_QUERY_MS,
+        "top_n": SLOW_QUERY_TOP_N,
+        "commands": command_summary(),
+        "slowest": slowest_queries(),
+    }
+
+@router.delete("/metrics/queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_query_stats(current_user: dict = Depends(get_current_admin_user)):
+    reset()
@@ -1,13 +1,39 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from models import Student, StudentCreate, StudentUpdate, StudentStatus
-from auth import get_current_user
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from models import Student, StudentCreate, StudentUpdate, StudentStatus, StudentPage, StudentSort, SortOrder, ImportReport, ExportFormat
+from models import StudentBatch, StudentBatchOperation, StudentBatchItem, StudentBatchResult
+from auth import get_current_user, get_current_user_for_media
 from database import db
+from cache import dashboard_cache
+from stats import SCOPES, record_student_change, record_student_changes
+from student_import import import_students
+from data_export import STUDENT_COLUMNS, export_response, projection
+from photo_store import save_photo_data_uri, open_photo, release_photo, decode_data_uri, migrate_inline_photo
+from text_search import name_tokens, search_filter
+from fast_response import fast_lists_enabled, model_projection, complete_defaults, json_response
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor, keyset_filter, cursor_values
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import uuid
 
 router = APIRouter(prefix="/students", tags=["students"])
 
+STUDENT_SORT = [("name", 1), ("id", 1)]
+SORT_FIELDS = {
+    StudentSort.NAME: "name",
+    StudentSort.CREATED_AT: "created_at",
+    StudentSort.TURMA: "turma_name",
+    StudentSort.COURSE: "course_name",
+    StudentSort.STATUS: "status",
+}
+# Documentos antigos podem ainda ter a foto base64 inline; ela nunca vai nas listagens
+STUDENT_PROJECTION = {"_id": 0, "photo": 0, "name_tokens": 0}
+STUDENT_FIELDS = model_projection(Student)
+# Campos que definem os contadores de stats.SCOPES e quantas vezes o lote é
+# relido quando outro request altera um aluno entre a leitura e a escrita
+BATCH_STAT_FIELDS = tuple(SCOPES.values())
+BATCH_ATTEMPTS = 3
+
 @router.post("", response_model=Student, status_code=status.HTTP_201_CREATED)
 async def create_student(student_data: StudentCreate, current_user: dict = Depends(get_current_user)):
     turma_doc = await db.turmas.find_one({"id": student_data.turma_id}, {"_id": 0})
@@ -18,66 +44,248 @@ async def create_student(student_data: StudentCreate, current_user: dict = Depen
         )
     
     student_dict = student_data.model_dump()
+    photo = student_dict.pop("photo", None)
+    student_dict["photo_id"] = await save_photo_data_uri(photo) if photo else None
     student_dict["id"] = str(uuid.uuid4())
+    student_dict["name_tokens"] = name_tokens(student_dict["name"])
     student_dict["turma_name"] = turma_doc["name"]
     student_dict["course_name"] = turma_doc["course_name"]
     student_dict["status"] = StudentStatus.ACTIVE
-    student_dict["created_at"] = datetime.now(timezone.utc).isoformat()
+    student_dict["created_at"] = datetime.now(timezone.utc)
     
     await db.students.insert_one(student_dict)
+    await record_student_change(None, student_dict)
+    dashboard_cache.invalidate()
     
-    student_dict['created_at'] = datetime.fromisoformat(student_dict['created_at'])
     return Student(**student_dict)
 
-@router.get("", response_model=List[Student])
-async def get_students(
+@router.post("/import", response_model=ImportReport)
+async def import_students_file(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
+    """
+    Importa alunos de uma planilha CSV ou XLSX (colunas: nome, email, telefone,
+    data de nascimento, turma ou turma_id, status)
+    """
+    return await import_students(file)
+
+@router.post("/batch", response_model=StudentBatchResult)
+async def batch_students(batch: StudentBatch, current_user: dict = Depends(get_current_user)):
+    """
+    Aplica a mesma operação (trocar de turma, mudar status ou excluir) a vários
+    alunos com um único update_many/delete_many
+    """
+    ids = list(dict.fromkeys(batch.ids))
+    update_data = None
+    
+    if batch.operation == StudentBatchOperation.MOVE_TURMA:
+        if not batch.turma_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe a turma de destino",
+            )
+        turma_doc = await db.turmas.find_one({"id": batch.turma_id}, {"_id": 0, "id": 1, "name": 1, "course_name": 1})
+        if not turma_doc:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Turma não encontrada",
+            )
+        update_data = {"turma_id": turma_doc["id"], "turma_name": turma_doc["name"], "course_name": turma_doc["course_name"]}
+    elif batch.operation == StudentBatchOperation.SET_STATUS:
+        if batch.status is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe o novo status",
+            )
+        update_data = {"status": batch.status.value}
+    
+    done, changed = await _apply_batch(ids, update_data)
+    if done:
+        dashboard_cache.invalidate()
+    
+    return StudentBatchResult(
+        operation=batch.operation,
+        processed=len(done),
+        results=[
+            StudentBatchItem(id=student_id, ok=True) if student_id in done
+            else StudentBatchItem(id=student_id, ok=False, error="Aluno alterado por outra operação; tente novamente")
+            if student_id in changed
+            else StudentBatchItem(id=student_id, ok=False, error="Aluno não encontrado")
+            for student_id in ids
+        ],
+    )
+
+async def _apply_batch(ids: List[str], update_data: Optional[dict]) -> Tuple[set, set]:
+    """
+    Grava o lote (update_data=None exclui os alunos) agrupando os alunos pelos
+    campos dos contadores (turma, curso, status) lidos antes da escrita. Cada update_many/delete_many é condicionado
+    a esses valores, então os contadores recebem exatamente a transição que foi
+    gravada; quem mudou no meio do caminho é relido e tentado de novo.
+    Devolve (ids gravados, ids que continuaram mudando).
+    """
+    done, pending = set(), ids
+    for _ in range(BATCH_ATTEMPTS):
+        groups: Dict[Tuple, List[str]] = {}
+        photo_ids = set()
+        async for student in db.students.find(
+            {"id": {"$in": pending}},
+            {"_id": 0, "id": 1, "photo_id": 1, **{field: 1 for field in BATCH_STAT_FIELDS}}
+        ):
+            groups.setdefault(tuple(student.get(field) for field in BATCH_STAT_FIELDS), []).append(student["id"])
+            photo_ids.add(student.get("photo_id"))
+        if not groups:
+            break
+        
+        changes = []
+        for values, group_ids in groups.items():
+            old = dict(zip(BATCH_STAT_FIELDS, values))
+            query = {"id": {"$in": group_ids}, **old}
+            if update_data is None:
+                count = (await db.students.delete_many(query)).deleted_count
+                changes += [(old, None)] * count
+            else:
+                count = (await db.students.update_many(query, {"$set": update_data})).modified_count
+                changes += [(old, {**old, **update_data})] * count
+        await record_student_changes(changes)
+        for photo_id in photo_ids:
+            await release_photo(photo_id)
+        
+        # Quem não casou com o filtro foi alterado por outra operação entre a
+        # leitura e a escrita; relê e tenta de novo com os valores atuais
+        seen = [student_id for group_ids in groups.values() for student_id in group_ids]
+        missed_query = {"id": {"$in": seen}}
+        if update_data is not None:
+            missed_query["$or"] = [{field: {"$ne": value}} for field, value in update_data.items()]
+        missed = {student["id"] async for student in db.students.find(missed_query, {"_id": 0, "id": 1})}
+        done.update(student_id for student_id in seen if student_id not in missed)
+        pending = list(missed)
+        if not pending:
+            break
+    return done, set(pending) - done
+
+def student_filters(
+    q: Optional[str] = None,
     turma_id: Optional[str] = None,
+    course: Optional[str] = None,
     status_filter: Optional[StudentStatus] = None,
-    current_user: dict = Depends(get_current_user)
-):
-    query = {}
+    student_status: Optional[StudentStatus] = Query(None, alias="status"),
+) -> dict:
+    """
+    Filtros comuns da listagem e da exportação de alunos
+    """
+    query = search_filter(q) if q else {}
     if turma_id:
         query["turma_id"] = turma_id
-    if status_filter:
-        query["status"] = status_filter
+    if course:
+        query["course_name"] = course
+    if student_status or status_filter:
+        query["status"] = student_status or status_filter
+    return query
+
+def student_sort(sort: StudentSort, order: SortOrder) -> List[Tuple[str, int]]:
+    direction = 1 if order == SortOrder.ASC else -1
+    keys = [SORT_FIELDS[sort], "name", "id"] if sort != StudentSort.NAME else ["name", "id"]
+    return [(key, direction) for key in keys]
+
+@router.get("", response_model=StudentPage)
+async def get_students(
+    query: dict = Depends(student_filters),
+    sort: StudentSort = StudentSort.NAME,
+    order: SortOrder = SortOrder.ASC,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    sort_keys = student_sort(sort, order)
+    total = await db.students.count_documents(query) if with_total else None
+    if cursor:
+        query = {**query, **keyset_filter(sort_keys, decode_cursor(cursor, len(sort_keys)))}
     
-    students = await db.students.find(query, {"_id": 0}).to_list(1000)
+    fast = fast_lists_enabled()
+    students = await db.students.find(query, STUDENT_FIELDS if fast else STUDENT_PROJECTION).sort(sort_keys).limit(limit + 1).to_list(limit + 1)
     
-    for student in students:
-        if isinstance(student['created_at'], str):
-            student['created_at'] = datetime.fromisoformat(student['created_at'])
+    next_cursor = None
+    if len(students) > limit:
+        students = students[:limit]
+        next_cursor = encode_cursor(cursor_values(students[-1], sort_keys))
     
-    return students
+    if fast:
+        return json_response({"items": complete_defaults(students, Student), "next_cursor": next_cursor, "total": total})
+    return StudentPage(items=students, next_cursor=next_cursor, total=total)
+
+@router.get("/export")
+async def export_students(
+    format: ExportFormat = ExportFormat.CSV,
+    query: dict = Depends(student_filters),
+    current_user: dict = Depends(get_current_user)
+):
+    cursor = db.students.find(query, projection(STUDENT_COLUMNS)).sort(STUDENT_SORT)
+    return export_response(cursor, STUDENT_COLUMNS, format, "alunos")
 
 @router.get("/{student_id}", response_model=Student)
 async def get_student(student_id: str, current_user: dict = Depends(get_current_user)):
-    student_doc = await db.students.find_one({"id": student_id}, {"_id": 0})
+    student_doc = await db.students.find_one({"id": student_id}, STUDENT_PROJECTION)
     if not student_doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Aluno não encontrado",
         )
     
-    if isinstance(student_doc['created_at'], str):
-        student_doc['created_at'] = datetime.fromisoformat(student_doc['created_at'])
-    
     return Student(**student_doc)
 
-@router.put("/{student_id}", response_model=Student)
-async def update_student(
+@router.get("/{student_id}/photo")
+async def get_student_photo(
     student_id: str,
-    student_data: StudentUpdate,
-    current_user: dict = Depends(get_current_user)
+    request: Request,
+    v: Optional[str] = None,
+    size: Optional[int] = None,
+    current_user: dict = Depends(get_current_user_for_media)
 ):
-    existing_student = await db.students.find_one({"id": student_id}, {"_id": 0})
-    if not existing_student:
+    student_doc = await db.students.find_one({"id": student_id}, {"_id": 0, "photo_id": 1, "photo": 1})
+    if not student_doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Aluno não encontrado",
         )
     
+    photo_id = student_doc.get("photo_id")
+    if not photo_id and student_doc.get("photo"):
+        photo_id = await migrate_inline_photo(student_id, student_doc["photo"])
+    if photo_id:
+        # A URL versionada (?v=<hash>) nunca muda de conteúdo
+        etag = f'"{photo_id}@{size}"' if size else f'"{photo_id}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "private, max-age=31536000, immutable" if v == photo_id else "private, no-cache",
+        }
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        stored = await open_photo(photo_id, size)
+        if stored:
+            chunks, content_type, length = stored
+            headers["Content-Length"] = str(length)
+            return StreamingResponse(chunks, media_type=content_type, headers=headers)
+    elif student_doc.get("photo"):
+        # Foto antiga que não é uma imagem válida: não há miniaturas, vai o original
+        content, content_type = decode_data_uri(student_doc["photo"])
+        return Response(content, media_type=content_type)
+    
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Foto não encontrada",
+    )
+
+@router.put("/{student_id}", response_model=Student)
+async def update_student(
+    student_id: str,
+    student_data: StudentUpdate,
+    current_user: dict = Depends(get_current_user)
+):
     update_data = student_data.model_dump(exclude_unset=True)
     
+    if update_data.get("name"):
+        update_data["name_tokens"] = name_tokens(update_data["name"])
+    
     if "turma_id" in update_data:
         turma_doc = await db.turmas.find_one({"id": update_data["turma_id"]}, {"_id": 0})
         if not turma_doc:
@@ -88,19 +296,54 @@ async def update_student(
         update_data["turma_name"] = turma_doc["name"]
         update_data["course_name"] = turma_doc["course_name"]
     
-    await db.students.update_one({"id": student_id}, {"$set": update_data})
+    # A foto só é gravada depois das validações; se a escrita do aluno falhar, é liberada
+    # photo ausente mantém a foto atual; string vazia remove
+    if "photo" in update_data:
+        photo = update_data.pop("photo")
+        update_data["photo_id"] = await save_photo_data_uri(photo) if photo else None
     
-    updated_student = await db.students.find_one({"id": student_id}, {"_id": 0})
-    if isinstance(updated_student['created_at'], str):
-        updated_student['created_at'] = datetime.fromisoformat(updated_student['created_at'])
+    # Uma ida ao banco: o documento anterior alimenta os contadores e o novo é ele + update_data
+    try:
+        if update_data:
+            update_ops = {"$set": update_data}
+            if "photo_id" in update_data:
+                update_ops["$unset"] = {"photo": ""}
+            existing_student = await db.students.find_one_and_update({"id": student_id}, update_ops, STUDENT_PROJECTION)
+        else:
+            existing_student = await db.students.find_one({"id": student_id}, STUDENT_PROJECTION)
+    except Exception:
+        await release_photo(update_data.get("photo_id"))
+        raise
+    if not existing_student:
+        await release_photo(update_data.get("photo_id"))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Aluno não encontrado",
+        )
+    
+    updated_student = {**existing_student, **update_data}
+    updated_student.pop("name_tokens", None)
+    await record_student_change(existing_student, updated_student)
+    dashboard_cache.invalidate()
+    
+    if "photo_id" in update_data and update_data["photo_id"] != existing_student.get("photo_id"):
+        await release_photo(existing_student.get("photo_id"))
     
     return Student(**updated_student)
 
 @router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_student(student_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.students.delete_one({"id": student_id})
-    if result.deleted_count == 0:
+    deleted = await db.students.find_one_and_delete(
+        {"id": student_id},
+        {"_id": 0, "id": 1, "photo_id": 1, "turma_id": 1, "course_name": 1, "status": 1}
+    )
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Aluno não encontrado",
-        )
\ No newline at end of file
+        )
+    
+    await record_student_change(deleted, None)
+    dashboard_cache.invalidate()
+    
+    await release_photo(deleted.get("photo_id"))
\ No newline at end of file
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from models import Turma, TurmaCreate, TurmaUpdate
+from fastapi import APIRouter, HTTPException, status, Depends, Response
+from fastapi.responses import StreamingResponse
+from models import Turma, TurmaCreate, TurmaUpdate, ExportFormat
 from auth import get_current_user, get_current_admin_user
 from database import db
+from fast_response import fast_lists_enabled, model_projection, complete_defaults, json_response
+from cache import dashboard_cache
+from cascade import start_cascade
+from pdf_export import photo_grid_pdf
+from data_export import TURMA_COLUMNS, export_response, projection
 from datetime import datetime, timezone
-from typing import List
+from typing import AsyncIterator, List
+import re
 import uuid
 
 router = APIRouter(prefix="/turmas", tags=["turmas"])
 
+def _pdf_response(content: AsyncIterator[bytes], name: str) -> StreamingResponse:
+    file_name = re.sub(r"\s+", "_", re.sub(r"[^a-zA-Z0-9\s]", "", name)) or "grade_de_fotos"
+    return StreamingResponse(
+        content,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}.pdf"'},
+    )
+
 @router.post("", response_model=Turma, status_code=status.HTTP_201_CREATED)
 async def create_turma(turma_data: TurmaCreate, current_user: dict = Depends(get_current_admin_user)):
     course_doc = await db.courses.find_one({"id": turma_data.course_id}, {"_id": 0})
@@ -21,23 +36,55 @@ async def create_turma(turma_data: TurmaCreate, current_user: dict = Depends(get
     turma_dict["id"] = str(uuid.uuid4())
     turma_dict["course_name"] = course_doc["name"]
     turma_dict["active"] = True
-    turma_dict["created_at"] = datetime.now(timezone.utc).isoformat()
+    turma_dict["created_at"] = datetime.now(timezone.utc)
     
     await db.turmas.insert_one(turma_dict)
+    dashboard_cache.invalidate()
     
-    turma_dict['created_at'] = datetime.fromisoformat(turma_dict['created_at'])
     return Turma(**turma_dict)
 
 @router.get("", response_model=List[Turma])
 async def get_turmas(current_user: dict = Depends(get_current_user)):
-    turmas = await db.turmas.find({}, {"_id": 0}).to_list(1000)
+    if fast_lists_enabled():
+        turmas = await db.turmas.find({}, model_projection(Turma)).to_list(1000)
+        return json_response(complete_defaults(turmas, Turma))
     
-    for turma in turmas:
-        if isinstance(turma['created_at'], str):
-            turma['created_at'] = datetime.fromisoformat(turma['created_at'])
+    turmas = await db.turmas.find({}, {"_id": 0}).to_list(1000)
     
     return turmas
 
+@router.get("/export")
+async def export_turmas(format: ExportFormat = ExportFormat.CSV, current_user: dict = Depends(get_current_user)):
+    cursor = db.turmas.find({}, projection(TURMA_COLUMNS)).sort("name", 1)
+    return export_response(cursor, TURMA_COLUMNS, format, "turmas")
+
+@router.get("/photo-grid.pdf")
+async def export_all_photo_grids(current_user: dict = Depends(get_current_user)):
+    turma_ids = await db.students.distinct("turma_id")
+    turmas = await db.turmas.find(
+        {"id": {"$in": turma_ids}},
+        {"_id": 0, "id": 1, "name": 1}
+    ).sort("name", 1).to_list(None)
+    
+    if not turmas:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhum aluno encontrado",
+        )
+    
+    return _pdf_response(photo_grid_pdf(turmas), "Todas as Turmas")
+
+@router.get("/{turma_id}/photo-grid.pdf")
+async def export_photo_grid(turma_id: str, current_user: dict = Depends(get_current_user)):
+    turma_doc = await db.turmas.find_one({"id": turma_id}, {"_id": 0, "id": 1, "name": 1})
+    if not turma_doc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Turma não encontrada",
+        )
+    
+    return _pdf_response(photo_grid_pdf([turma_doc]), turma_doc["name"])
+
 @router.get("/{turma_id}", response_model=Turma)
 async def get_turma(turma_id: str, current_user: dict = Depends(get_current_user)):
     turma_doc = await db.turmas.find_one({"id": turma_id}, {"_id": 0})
@@ -47,24 +94,15 @@ async def get_turma(turma_id: str, current_user: dict = Depends(get_current_user
             detail="Turma não encontrada",
         )
     
-    if isinstance(turma_doc['created_at'], str):
-        turma_doc['created_at'] = datetime.fromisoformat(turma_doc['created_at'])
-    
     return Turma(**turma_doc)
 
 @router.put("/{turma_id}", response_model=Turma)
 async def update_turma(
     turma_id: str,
     turma_data: TurmaUpdate,
+    response: Response,
     current_user: dict = Depends(get_current_admin_user)
 ):
-    existing_turma = await db.turmas.find_one({"id": turma_id})
-    if not existing_turma:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Turma não encontrada",
-        )
-    
     update_data = turma_data.model_dump(exclude_unset=True)
     
     if "course_id" in update_data:
@@ -76,17 +114,29 @@ async def update_turma(
             )
         update_data["course_name"] = course_doc["name"]
     
-    await db.turmas.update_one({"id": turma_id}, {"$set": update_data})
+    # Uma ida ao banco: o documento anterior decide a propagação e o novo é ele + update_data
+    if update_data:
+        existing_turma = await db.turmas.find_one_and_update({"id": turma_id}, {"$set": update_data}, {"_id": 0})
+    else:
+        existing_turma = await db.turmas.find_one({"id": turma_id}, {"_id": 0})
+    if not existing_turma:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Turma não encontrada",
+        )
+    dashboard_cache.invalidate()
     
-    updated_turma = await db.turmas.find_one({"id": turma_id}, {"_id": 0})
-    if isinstance(updated_turma['created_at'], str):
-        updated_turma['created_at'] = datetime.fromisoformat(updated_turma['created_at'])
+    # Alunos guardam o nome da turma e do curso; a propagação roda em segundo plano
+    if any(update_data.get(field, existing_turma.get(field)) != existing_turma.get(field) for field in ("name", "course_name")):
+        response.headers["X-Job-Id"] = await start_cascade("turma", turma_id)
     
+    updated_turma = {**existing_turma, **update_data}
     return Turma(**updated_turma)
 
 @router.delete("/{turma_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_turma(turma_id: str, current_user: dict = Depends(get_current_admin_user)):
     result = await db.turmas.delete_one({"id": turma_id})
+    dashboard_cache.invalidate()
     if result.deleted_count == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
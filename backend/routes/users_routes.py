@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from models import User, UserCreate, UserRole
-from auth import get_current_admin_user, get_password_hash
+from auth import get_current_admin_user, get_password_hash_async
 from database import db
+from fast_response import fast_lists_enabled, model_projection, complete_defaults, json_response
 from datetime import datetime, timezone
 from typing import List
 import uuid
@@ -19,24 +20,23 @@ async def create_user(user_data: UserCreate, current_user: dict = Depends(get_cu
     
     user_dict = user_data.model_dump()
     user_dict["id"] = str(uuid.uuid4())
-    user_dict["password"] = get_password_hash(user_data.password)
+    user_dict["password"] = await get_password_hash_async(user_data.password)
     user_dict["active"] = True
-    user_dict["created_at"] = datetime.now(timezone.utc).isoformat()
+    user_dict["created_at"] = datetime.now(timezone.utc)
     
     await db.users.insert_one(user_dict)
     
     user_dict.pop("password")
-    user_dict['created_at'] = datetime.fromisoformat(user_dict['created_at'])
     
     return User(**user_dict)
 
 @router.get("", response_model=List[User])
 async def get_users(current_user: dict = Depends(get_current_admin_user)):
-    users = await db.users.find({}, {"_id": 0, "password": 0}).to_list(1000)
+    if fast_lists_enabled():
+        users = await db.users.find({}, model_projection(User)).to_list(1000)
+        return json_response(complete_defaults(users, User))
     
-    for user in users:
-        if isinstance(user['created_at'], str):
-            user['created_at'] = datetime.fromisoformat(user['created_at'])
+    users = await db.users.find({}, {"_id": 0, "password": 0}).to_list(1000)
     
     return users
 
@@ -49,9 +49,6 @@ async def get_user(user_id: str, current_user: dict = Depends(get_current_admin_
             detail="Usuário não encontrado",
         )
     
-    if isinstance(user_doc['created_at'], str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-    
     return User(**user_doc)
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -21,7 +21,7 @@ async def seed_database():
         "name": "Administrador",
         "role": "admin",
         "active": True,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     
     professor_user = {
@@ -31,7 +31,7 @@ async def seed_database():
         "name": "Professor",
         "role": "professor",
         "active": True,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     
     await db.users.delete_many({})
@@ -50,7 +50,7 @@ async def seed_database():
             "workload": 3200,
             "description": "Curso superior em Engenharia de Software",
             "active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -58,7 +58,7 @@ async def seed_database():
             "workload": 3000,
             "description": "Curso superior em Administração",
             "active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     
@@ -79,7 +79,7 @@ async def seed_database():
             "period": "Matutino",
             "year": 2025,
             "active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     
     turma_count = await db.turmas.count_documents({})
@@ -0,0 +1,238 @@
+"""
+Gera uma base de teste em volume de produção, reprodutível pela semente.
+
+Os alunos são gerados em lotes sob demanda (sem montar a lista inteira em
+memória), em processos separados, e gravados com insert_many não ordenado,
+opcionalmente por vários workers em paralelo. Os índices são removidos antes da carga e recriados no
+final (init_db), o que é bem mais rápido que mantê-los a cada inserção.
+
+Uso (a partir de backend/, com o backend parado):
+    python seed_bulk.py --students 1000000 --seed 42 --reset
+    python seed_bulk.py --students 50000 --photos 200 --photo-ratio 0.8 --workers 8
+
+A mesma semente gera sempre os mesmos cursos, turmas, alunos e fotos, qualquer
+que seja o número de workers. Usuários não são criados (use seed.py). Com
+--reset, as fotos já gravadas também são apagadas.
+"""
+from dotenv import load_dotenv
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from text_search import fold, name_tokens
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+import argparse
+import asyncio
+import io
+import random
+import time
+import uuid
+
+FIRST_NAMES = [
+    "João", "Maria", "Pedro", "Ana", "Lucas", "Juliana", "Felipe", "Beatriz", "Rafael", "Fernanda",
+    "Gabriel", "Carolina", "Matheus", "Amanda", "Bruno", "Larissa", "Thiago", "Camila", "Diego", "Letícia",
+    "Vinicius", "Mariana", "Guilherme", "Isabela", "Rodrigo", "Patrícia", "Marcelo", "Jéssica", "André", "Aline",
+    "Gustavo", "Priscila", "Renato", "Natália", "Leonardo", "Vanessa", "Ricardo", "Bruna", "Carlos", "Tatiana",
+    "Paulo", "Adriana", "Marcos", "Daniela", "Fernando", "Roberta", "Henrique", "Sabrina", "Eduardo", "Cristina",
+    "Alexandre", "Michele", "Daniel", "Bianca", "José", "Eliane", "Fábio", "Raquel", "Leandro", "Simone"
+]
+
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Lima", "Ferreira", "Costa", "Rodrigues", "Almeida", "Nascimento",
+    "Araújo", "Ribeiro", "Carvalho", "Gomes", "Martins", "Rocha", "Barbosa", "Dias", "Castro", "Monteiro",
+    "Cardoso", "Correia", "Pereira", "Mendes", "Teixeira", "Moreira", "Cavalcanti", "Melo", "Azevedo", "Campos"
+]
+
+COURSES = [
+    ("Administração", 3000), ("Ciência da Computação", 3200), ("Direito", 3600), ("Enfermagem", 4000),
+    ("Engenharia Civil", 3600), ("Engenharia de Software", 3200), ("Medicina", 7200), ("Pedagogia", 3200),
+    ("Psicologia", 4000), ("Sistemas de Informação", 3000),
+]
+
+PERIODS = ["Matutino", "Vespertino", "Noturno", "Integral"]
+YEARS = [2023, 2024, 2025]
+STATUS_WEIGHTS = {"active": 80, "inactive": 12, "graduated": 8}
+
+# Todas as datas partem daqui para a base não depender do dia em que foi gerada
+BASE_DATE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# Tamanhos de foto 3x4 tirada no celular e reduzida pelo aplicativo
+PHOTO_DIMENSIONS = [(480, 640), (600, 800), (768, 1024)]
+
+def make_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def synthetic_photo(rng: random.Random) -> bytes:
+    """
+    JPEG com textura aleatória suave: comprime como uma foto real (dezenas a
+    centenas de KB), ao contrário de uma imagem de cor sólida
+    """
+    from PIL import Image
+
+    width, height = rng.choice(PHOTO_DIMENSIONS)
+    noise = Image.frombytes("RGB", (width // 8, height // 8), rng.randbytes((width // 8) * (height // 8) * 3))
+    image = noise.resize((width, height), Image.BICUBIC)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=rng.randint(80, 92))
+    return buffer.getvalue()
+
+def build_catalog(rng: random.Random, turma_count: int):
+    """
+    Cursos e turmas (repartidas entre os cursos)
+    """
+    courses = [
+        {
+            "id": make_id(rng),
+            "name": name,
+            "workload": workload,
+            "description": f"Bacharelado em {name}",
+            "active": True,
+            "created_at": BASE_DATE - timedelta(days=365),
+        }
+        for name, workload in COURSES
+    ]
+    turmas = []
+    for index in range(turma_count):
+        course = courses[index % len(courses)]
+        year = rng.choice(YEARS)
+        turmas.append({
+            "id": make_id(rng),
+            "name": f"{course['name']} - {year}.{index // len(courses) + 1}",
+            "course_id": course["id"],
+            "course_name": course["name"],
+            "period": rng.choice(PERIODS),
+            "year": year,
+            "active": True,
+            "created_at": BASE_DATE - timedelta(days=180),
+        })
+    return courses, turmas
+
+def build_batch(seed: int, batch_index: int, start: int, count: int, turmas: list, photo_ids: list, photo_ratio: float) -> list:
+    """
+    Alunos [start, start + count). Cada lote tem o próprio gerador, derivado
+    da semente, para que o resultado não dependa da ordem de execução.
+    """
+    rng = random.Random(f"{seed}-students-{batch_index}")
+    statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    students = []
+    for number in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        name = f"{first} {rng.choice(LAST_NAMES)} {last}"
+        turma = turmas[rng.randrange(len(turmas))]
+        students.append({
+            "id": make_id(rng),
+            "name": name,
+            "name_tokens": name_tokens(name),
+            "email": f"{fold(first)}.{fold(last)}{number}@aluno.escola.com.br",
+            "phone": f"({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            "birth_date": f"{rng.randint(1985, 2008)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "photo_id": rng.choice(photo_ids) if photo_ids and rng.random() < photo_ratio else None,
+            "turma_id": turma["id"],
+            "turma_name": turma["name"],
+            "course_name": turma["course_name"],
+            "status": rng.choices(statuses, weights)[0],
+            "created_at": BASE_DATE + timedelta(seconds=number * 7),
+        })
+    return students
+
+# Turmas e fotos de cada processo gerador, enviadas uma vez só (initializer)
+# em vez de serializadas a cada lote
+_catalog: dict = {}
+
+def _init_generator(turmas: list, photo_ids: list):
+    _catalog["turmas"] = turmas
+    _catalog["photo_ids"] = photo_ids
+
+def _generate_batch(seed: int, batch_index: int, start: int, count: int, photo_ratio: float) -> list:
+    return build_batch(seed, batch_index, start, count, _catalog["turmas"], _catalog["photo_ids"], photo_ratio)
+
+async def seed_bulk(total: int, seed: int, batch_size: int, workers: int, photo_count: int, photo_ratio: float,
+                    per_turma: int, reset: bool):
+    # Importados aqui para que os processos geradores (que reimportam este
+    # módulo no Windows e no macOS) não abram conexão com o banco
+    from database import db, init_db
+    from photo_store import PHOTO_BUCKET, photos_bucket, save_photo
+    from stats import rebuild_stats
+
+    if reset:
+        print("🗑️  Apagando alunos, turmas, cursos e fotos...")
+        await db.students.delete_many({})
+        await db.turmas.delete_many({})
+        await db.courses.delete_many({})
+        async for file_doc in db[f"{PHOTO_BUCKET}.files"].find({}, {"_id": 1}):
+            await photos_bucket.delete(file_doc["_id"])
+    elif await db.students.count_documents({}, limit=1):
+        raise SystemExit("O banco já tem alunos; use --reset para apagá-los antes da carga")
+
+    # Sem índices durante a carga; init_db recria todos no final
+    for collection in ("students", "turmas", "courses"):
+        await db[collection].drop_indexes()
+
+    rng = random.Random(seed)
+    courses, turmas = build_catalog(rng, max(1, -(-total // per_turma)))
+    await db.courses.insert_many(courses, ordered=False)
+    await db.turmas.insert_many(turmas, ordered=False)
+    print(f"✓ {len(courses)} cursos e {len(turmas)} turmas")
+
+    photo_ids = []
+    if photo_count:
+        started = time.perf_counter()
+        for _ in range(photo_count):
+            photo_ids.append(await save_photo(synthetic_photo(rng), "image/jpeg"))
+        print(f"✓ {photo_count} fotos sintéticas gravadas em {time.perf_counter() - started:.1f} s")
+
+    batch_total = -(-total // batch_size)
+    workers = max(1, min(workers, batch_total))
+    next_batch = iter(range(batch_total))
+    inserted = 0
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    # Gerar os alunos é CPU puro; cada worker gera o lote num processo e só
+    # a gravação fica no event loop
+    generators = ProcessPoolExecutor(workers, initializer=_init_generator, initargs=(turmas, photo_ids))
+
+    async def worker():
+        nonlocal inserted
+        for batch_index in next_batch:
+            start = batch_index * batch_size
+            students = await loop.run_in_executor(
+                generators, _generate_batch, seed, batch_index, start, min(batch_size, total - start), photo_ratio
+            )
+            await db.students.insert_many(students, ordered=False)
+            inserted += len(students)
+            if (batch_index + 1) % 10 == 0 or inserted == total:
+                rate = inserted / (time.perf_counter() - started)
+                print(f"  ✓ {inserted}/{total} alunos ({rate:.0f}/s)")
+
+    with generators:
+        await asyncio.gather(*(worker() for _ in range(workers)))
+    print(f"✓ {inserted} alunos gravados em {time.perf_counter() - started:.1f} s")
+
+    started = time.perf_counter()
+    await init_db()
+    print(f"✓ Índices criados em {time.perf_counter() - started:.1f} s")
+
+    started = time.perf_counter()
+    await rebuild_stats()
+    print(f"✓ Contadores do dashboard recalculados em {time.perf_counter() - started:.1f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100000, help="Quantidade de alunos")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Alunos por insert_many")
+    parser.add_argument("--workers", type=int, default=4, help="Lotes gerados e gravados em paralelo")
+    parser.add_argument("--photos", type=int, default=0, help="Fotos sintéticas distintas (compartilhadas entre os alunos)")
+    parser.add_argument("--photo-ratio", type=float, default=0.7, help="Fração dos alunos com foto")
+    parser.add_argument("--per-turma", type=int, default=40, help="Alunos por turma")
+    parser.add_argument("--reset", action="store_true", help="Apaga alunos, turmas, cursos e fotos antes da carga")
+    args = parser.parse_args()
+
+    asyncio.run(seed_bulk(
+        args.students, args.seed, args.batch_size, args.workers, args.photos, args.photo_ratio, args.per_turma, args.reset
+    ))
+
+if __name__ == "__main__":
+    main()
@@ -97,7 +97,7 @@ async def criar_cursos():
             "name": curso_data["name"],
             "workload": curso_data["workload"],
             "description": curso_data["description"],
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.courses.insert_one(curso)
         cursos_criados.append(curso)
@@ -121,7 +121,7 @@ async def criar_turmas(cursos):
                 "course_name": curso["name"],
                 "period": periodo,
                 "year": ano_atual,
-                "created_at": datetime.now(timezone.utc).isoformat()
+                "created_at": datetime.now(timezone.utc)
             }
             await db.turmas.insert_one(turma)
             turmas_criadas.append(turma)
@@ -150,9 +150,9 @@ async def criar_alunos(turmas):
                 "turma_id": turma["id"],
                 "turma_name": turma["name"],
                 "course_name": turma["course_name"],
-                "photo": "",  # Sem foto por padrão
+                "photo_id": None,  # Sem foto por padrão
                 "status": random.choices(["active", "inactive", "graduated"], weights=[85, 10, 5])[0],
-                "created_at": datetime.now(timezone.utc).isoformat()
+                "created_at": datetime.now(timezone.utc)
             }
             alunos_turma.append(aluno)
         
@@ -163,6 +163,17 @@ async def criar_alunos(turmas):
     print(f"\n✅ {total_alunos} alunos criados no total!")
     return total_alunos
 
+async def atualizar_contadores():
+    """Recalcula os contadores do dashboard e o campo de busca dos alunos"""
+    os.environ.setdefault('MONGO_URL', mongo_url)
+    os.environ.setdefault('DB_NAME', db_name)
+    from stats import rebuild_stats
+    from text_search import ensure_search_fields
+    
+    await rebuild_stats()
+    await ensure_search_fields()
+    print("\n✅ Contadores do dashboard recalculados!")
+
 async def main():
     print("=" * 60)
     print("🎓 SGE - Script de Seed do Banco de Dados")
@@ -182,6 +193,7 @@ async def main():
         cursos = await criar_cursos()
         turmas = await criar_turmas(cursos)
         total_alunos = await criar_alunos(turmas)
+        await atualizar_contadores()
         
         # Resumo final
         print("\n" + "=" * 60)
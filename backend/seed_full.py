@@ -9,6 +9,9 @@ ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 from database import db
+from photo_store import save_photo_data_uri
+from stats import rebuild_stats
+from text_search import name_tokens
 from auth import get_password_hash
 from datetime import datetime, timezone
 import uuid
@@ -100,7 +103,7 @@ async def seed_database():
             "workload": curso_data["workload"],
             "description": curso_data["description"],
             "active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.courses.insert_one(curso)
         new_courses.append(curso)
@@ -127,7 +130,7 @@ async def seed_database():
                 "period": periodo,
                 "year": ano,
                 "active": True,
-                "created_at": datetime.now(timezone.utc).isoformat()
+                "created_at": datetime.now(timezone.utc)
             }
             await db.turmas.insert_one(turma)
             all_turmas.append(turma)
@@ -153,19 +156,21 @@ async def seed_database():
             
             # Gerar foto (avatar)
             photo = get_avatar_base64(seed)
+            photo_id = await save_photo_data_uri(photo) if photo else None
             
             aluno = {
                 "id": str(uuid.uuid4()),
                 "name": name,
+                "name_tokens": name_tokens(name),
                 "email": generate_email(name),
                 "phone": generate_phone(),
                 "birth_date": generate_birth_date(),
-                "photo": photo,
+                "photo_id": photo_id,
                 "turma_id": turma["id"],
                 "turma_name": turma["name"],
                 "course_name": turma["course_name"],
                 "status": "active",
-                "created_at": datetime.now(timezone.utc).isoformat()
+                "created_at": datetime.now(timezone.utc)
             }
             
             await db.students.insert_one(aluno)
@@ -175,6 +180,9 @@ async def seed_database():
             if (j + 1) % 10 == 0:
                 print(f"    ✓ {j+1}/30 alunos criados para esta turma")
     
+    await rebuild_stats()
+    print("\n✅ Contadores do dashboard recalculados")
+    
     print(f"\n🎉 SEED CONCLUÍDO COM SUCESSO!")
     print(f"\n📊 Resumo:")
     print(f"  • Cursos: {len(all_courses)}")
@@ -1,29 +1,31 @@
+import time
+
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.datastructures import URL
+import asyncio
 import os
 import logging
 from pathlib import Path
-from database import init_db
-from routes import auth_routes, students_routes, courses_routes, turmas_routes, institution_routes, users_routes, dashboard_routes
+from database import client, warm_pool, init_db, audit_indexes
+from stats import ensure_stats
+from migrate_dates import ensure_native_dates
+from text_search import ensure_search_fields
+from cascade import resume_jobs
+from thumbnails import shutdown_pool
+from middleware import RemoveTrailingSlashMiddleware, MetricsMiddleware
+from auth import shutdown_password_pool
+from routes import auth_routes, students_routes, courses_routes, turmas_routes, institution_routes, users_routes, dashboard_routes, jobs_routes, metrics_routes
+
+IMPORT_SECONDS = time.perf_counter() - _import_started
+# Impressa no stdout ao fim da inicialização; o Electron espera por ela em vez de consultar /api/health
+READY_MESSAGE = "SGE_BACKEND_READY"
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-class RemoveTrailingSlashMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        url_path = request.url.path
-        if url_path != "/" and url_path.endswith("/"):
-            url_path = url_path.rstrip("/")
-            url = request.url.replace(path=url_path)
-            request._url = url
-            request.scope["path"] = url_path
-        response = await call_next(request)
-        return response
-
 app = FastAPI(title="SGE - Sistema de Gestão Escolar")
 
 app.add_middleware(RemoveTrailingSlashMiddleware)
@@ -36,6 +38,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Por último: fica por fora de todos e mede a requisição inteira
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_routes.router, prefix="/api")
 app.include_router(students_routes.router, prefix="/api")
 app.include_router(courses_routes.router, prefix="/api")
@@ -43,11 +48,42 @@ app.include_router(turmas_routes.router, prefix="/api")
 app.include_router(institution_routes.router, prefix="/api")
 app.include_router(users_routes.router, prefix="/api")
 app.include_router(dashboard_routes.router, prefix="/api")
+app.include_router(jobs_routes.router, prefix="/api")
+app.include_router(metrics_routes.router, prefix="/api")
+
+async def _audit_indexes():
+    try:
+        await audit_indexes()
+    except Exception as e:
+        logging.warning(f"Não foi possível auditar os índices: {e}")
 
 @app.on_event("startup")
 async def startup_event():
-    await init_db()
+    timings = {"importações": IMPORT_SECONDS}
+    phases = (
+        ("warm_pool", warm_pool),
+        ("init_db", init_db),
+        ("ensure_native_dates", ensure_native_dates),
+        ("ensure_stats", ensure_stats),
+        ("ensure_search_fields", ensure_search_fields),
+        ("resume_jobs", resume_jobs),
+    )
+    for name, phase in phases:
+        started = time.perf_counter()
+        await phase()
+        timings[name] = time.perf_counter() - started
     logging.info("Database initialized")
+    logging.info("Inicialização: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
+
+    # A auditoria de índices é só diagnóstico: roda em segundo plano, depois do sinal de pronto
+    app.state.audit_task = asyncio.create_task(_audit_indexes())
+    print(READY_MESSAGE, flush=True)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_pool()
+    shutdown_password_pool()
+    client.close()
 
 @app.get("/api/health")
 async def health_check():
@@ -0,0 +1,91 @@
+from database import db
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Contadores de alunos por curso (course_name), turma (turma_id) e status,
+# um documento por chave: {"_id": "course:Medicina", "scope": "course", "key": "Medicina", "count": 12}
+SCOPES = {"course": "course_name", "turma": "turma_id", "status": "status"}
+
+def _value(value):
+    # StudentStatus é um Enum de str; grava sempre o valor puro
+    return getattr(value, "value", value)
+
+def _keys(student: dict) -> Iterable[Tuple[str, str]]:
+    for scope, field in SCOPES.items():
+        yield scope, _value(student.get(field))
+
+def _stat_id(scope: str, key) -> str:
+    return f"{scope}:{key}"
+
+async def apply_deltas(deltas: Dict[Tuple[str, str], int]):
+    from pymongo import UpdateOne
+
+    ops = [
+        UpdateOne(
+            {"_id": _stat_id(scope, key)},
+            {"$inc": {"count": delta}, "$setOnInsert": {"scope": scope, "key": key}},
+            upsert=True,
+        )
+        for (scope, key), delta in deltas.items()
+        if delta
+    ]
+    if ops:
+        await db.stats.bulk_write(ops, ordered=False)
+
+async def record_student_change(old: Optional[dict], new: Optional[dict]):
+    """
+    Atualiza os contadores para a transição de um aluno de `old` para `new`
+    (old=None na criação, new=None na exclusão)
+    """
+    await record_student_changes([(old, new)])
+
+async def record_student_changes(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]):
+    """
+    Mesmo que record_student_change para vários alunos, num único bulk_write
+    """
+    deltas = Counter()
+    for old, new in changes:
+        for student, sign in ((old, -1), (new, 1)):
+            if student:
+                for key in _keys(student):
+                    deltas[key] += sign
+    await apply_deltas(deltas)
+
+async def record_students_added(students: List[dict]):
+    deltas = Counter()
+    for student in students:
+        for key in _keys(student):
+            deltas[key] += 1
+    await apply_deltas(deltas)
+
+async def get_stats() -> Dict[str, Dict[str, int]]:
+    result = {scope: {} for scope in SCOPES}
+    async for stat in db.stats.find({}, {"_id": 0}):
+        result.setdefault(stat["scope"], {})[stat["key"]] = stat["count"]
+    return result
+
+async def rebuild_stats():
+    """
+    Recalcula todos os contadores a partir da coleção de alunos
+    """
+    docs: List[dict] = []
+    for scope, field in SCOPES.items():
+        pipeline = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+        async for row in db.students.aggregate(pipeline):
+            key = _value(row["_id"])
+            docs.append({"_id": _stat_id(scope, key), "scope": scope, "key": key, "count": row["count"]})
+
+    await db.stats.delete_many({})
+    if docs:
+        await db.stats.insert_many(docs)
+    logger.info(f"Contadores recalculados: {len(docs)} chaves")
+
+async def ensure_stats():
+    """
+    Gera os contadores na primeira inicialização de um banco que já tem alunos
+    """
+    if await db.stats.estimated_document_count() == 0 and await db.students.estimated_document_count() > 0:
+        await rebuild_stats()
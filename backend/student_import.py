@@ -0,0 +1,260 @@
+from fastapi import HTTPException, UploadFile, status
+from pydantic import ValidationError
+from models import StudentCreate, StudentStatus, ImportReport, ImportRowError
+from database import db
+from cache import dashboard_cache
+from stats import record_students_added
+from text_search import fold, name_tokens
+from datetime import date, datetime, timezone
+from typing import Dict, Iterator, List, Tuple
+import asyncio
+import codecs
+import csv
+import io
+import uuid
+import zipfile
+
+IMPORT_BATCH_SIZE = 1000
+
+# Tentadas em ordem; cp1252 é o que o Excel em português usa ao salvar CSV
+CSV_ENCODINGS = ("utf-8-sig", "cp1252")
+
+# Cabeçalhos aceitos (sem acento, minúsculos) para cada campo do aluno
+COLUMN_ALIASES = {
+    "name": ("name", "nome", "nome completo", "aluno"),
+    "email": ("email", "e-mail"),
+    "phone": ("phone", "telefone", "celular"),
+    "birth_date": ("birth_date", "data de nascimento", "data_nascimento", "nascimento"),
+    "turma_id": ("turma_id",),
+    "turma": ("turma", "turma_name", "nome da turma"),
+    "status": ("status", "situacao"),
+}
+
+STATUS_ALIASES = {
+    "ativo": StudentStatus.ACTIVE,
+    "inativo": StudentStatus.INACTIVE,
+    "formado": StudentStatus.GRADUATED,
+}
+
+def _parse_status(value: str) -> StudentStatus:
+    value = fold(value)
+    return STATUS_ALIASES.get(value) or StudentStatus(value)
+
+def _map_header(header: List) -> Dict[int, str]:
+    lookup = {alias: field for field, aliases in COLUMN_ALIASES.items() for alias in aliases}
+    columns = {}
+    for index, title in enumerate(header):
+        field = lookup.get(fold(title)) if title is not None else None
+        if field:
+            columns[index] = field
+    if "name" not in columns.values():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A planilha precisa ter uma coluna 'nome'",
+        )
+    if "turma" not in columns.values() and "turma_id" not in columns.values():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A planilha precisa ter uma coluna 'turma' ou 'turma_id'",
+        )
+    return columns
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip() if value is not None else ""
+    return value or None
+
+def _csv_encoding(raw) -> str:
+    """
+    utf-8-sig ou, se o arquivo não for UTF-8 válido, cp1252 (o padrão do Excel
+    em português). O arquivo inteiro é verificado antes da primeira gravação.
+    """
+    for encoding in CSV_ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        raw.seek(0)
+        try:
+            while chunk := raw.read(1024 * 1024):
+                decoder.decode(chunk)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            continue
+        raw.seek(0)
+        return encoding
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Codificação do CSV não reconhecida. Salve o arquivo em UTF-8",
+    )
+
+def _iter_csv(upload: UploadFile) -> Iterator[List]:
+    text = io.TextIOWrapper(upload.file, encoding=_csv_encoding(upload.file), newline="")
+    try:
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(text, dialect)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Codificação do CSV não reconhecida. Salve o arquivo em UTF-8",
+        )
+
+def _iter_xlsx(upload: UploadFile) -> Iterator[List]:
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Importação de XLSX indisponível (openpyxl não instalado)",
+        )
+    try:
+        workbook = load_workbook(upload.file, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError, OSError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Arquivo XLSX inválido",
+        )
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+def iter_rows(upload: UploadFile) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Lê a planilha linha a linha, devolvendo (número da linha, campos do aluno)
+    """
+    file_name = (upload.filename or "").lower()
+    if file_name.endswith(".xlsx"):
+        rows = _iter_xlsx(upload)
+    elif file_name.endswith(".csv"):
+        rows = _iter_csv(upload)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato não suportado. Envie um arquivo .csv ou .xlsx",
+        )
+
+    header = next(rows, None)
+    if header is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Arquivo vazio",
+        )
+    columns = _map_header(header)
+
+    for line, row in enumerate(rows, start=2):
+        fields = {field: _cell(row[index]) for index, field in columns.items() if index < len(row)}
+        if any(fields.values()):
+            yield line, fields
+
+async def _load_turmas() -> Tuple[Dict[str, dict], Dict[str, List[dict]]]:
+    by_id, by_name = {}, {}
+    async for turma in db.turmas.find({}, {"_id": 0, "id": 1, "name": 1, "course_name": 1}):
+        by_id[turma["id"]] = turma
+        by_name.setdefault(fold(turma["name"]), []).append(turma)
+    return by_id, by_name
+
+def _validation_messages(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors()]
+
+async def _insert_batch(batch: List[Tuple[int, dict]], report: ImportReport):
+    from pymongo.errors import BulkWriteError
+
+    docs = [doc for _, doc in batch]
+    failed = set()
+    try:
+        await db.students.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get("writeErrors", []):
+            failed.add(write_error["index"])
+            report.errors.append(ImportRowError(row=batch[write_error["index"]][0], errors=[write_error["errmsg"]]))
+
+    inserted = [doc for index, doc in enumerate(docs) if index not in failed]
+    await record_students_added(inserted)
+    report.imported += len(inserted)
+
+def _prepare_batches(upload: UploadFile, turmas_by_id: Dict[str, dict], turmas_by_name: Dict[str, List[dict]],
+                     report: ImportReport) -> Iterator[List[Tuple[int, dict]]]:
+    """
+    Lê e valida a planilha, devolvendo lotes de (número da linha, aluno) prontos
+    para gravar. É síncrono (csv, openpyxl, Pydantic) e roda fora do event loop.
+    """
+    batch: List[Tuple[int, dict]] = []
+
+    for line, fields in iter_rows(upload):
+        report.total_rows += 1
+
+        turma = turmas_by_id.get(fields.get("turma_id") or "")
+        if turma is None and fields.get("turma"):
+            turma = turmas_by_id.get(fields["turma"])
+            matches = turmas_by_name.get(fold(fields["turma"]), [])
+            if turma is None and len(matches) > 1:
+                report.errors.append(ImportRowError(row=line, errors=[f"Turma ambígua: {fields['turma']}"]))
+                continue
+            turma = turma or (matches[0] if matches else None)
+        if turma is None:
+            report.errors.append(ImportRowError(row=line, errors=["Turma não encontrada"]))
+            continue
+
+        try:
+            student_data = StudentCreate(
+                name=fields.get("name"),
+                email=fields.get("email"),
+                phone=fields.get("phone"),
+                birth_date=fields.get("birth_date"),
+                turma_id=turma["id"],
+            )
+            student_status = _parse_status(fields["status"]) if fields.get("status") else StudentStatus.ACTIVE
+        except ValidationError as e:
+            report.errors.append(ImportRowError(row=line, errors=_validation_messages(e)))
+            continue
+        except ValueError:
+            report.errors.append(ImportRowError(row=line, errors=[f"Status inválido: {fields['status']}"]))
+            continue
+
+        student_dict = student_data.model_dump(exclude={"photo"})
+        student_dict["id"] = str(uuid.uuid4())
+        student_dict["name_tokens"] = name_tokens(student_dict["name"])
+        student_dict["photo_id"] = None
+        student_dict["turma_name"] = turma["name"]
+        student_dict["course_name"] = turma["course_name"]
+        student_dict["status"] = student_status.value
+        student_dict["created_at"] = datetime.now(timezone.utc)
+        batch.append((line, student_dict))
+
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+async def import_students(upload: UploadFile) -> ImportReport:
+    turmas_by_id, turmas_by_name = await _load_turmas()
+    report = ImportReport(total_rows=0, imported=0, errors=[])
+
+    # Cada lote é lido e validado numa thread; só a gravação fica no event loop
+    loop = asyncio.get_running_loop()
+    batches = _prepare_batches(upload, turmas_by_id, turmas_by_name, report)
+    try:
+        while True:
+            batch = await loop.run_in_executor(None, next, batches, None)
+            if batch is None:
+                break
+            await _insert_batch(batch, report)
+    finally:
+        batches.close()
+
+    if report.imported:
+        dashboard_cache.invalidate()
+    report.errors.sort(key=lambda error: error.row)
+    return report
@@ -0,0 +1,55 @@
+from database import db
+from typing import List, Tuple
+import logging
+import re
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+def fold(text: str) -> str:
+    """
+    Remove acentos, converte para minúsculas e normaliza espaços ("João  Silva" -> "joao silva")
+    """
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(text.strip().lower().split())
+
+def name_tokens(name: str) -> List[str]:
+    """
+    Palavras do nome sem acento, gravadas em `name_tokens` (índice multikey)
+    para busca por prefixo de qualquer parte do nome
+    """
+    return fold(name).split()
+
+def search_filter(q: str) -> dict:
+    """
+    Cada termo da busca precisa ser prefixo de alguma palavra do nome.
+    Regex ancorada em ^ usa os limites do índice em vez de varrer a coleção.
+    """
+    terms = [re.escape(term) for term in name_tokens(q)]
+    if not terms:
+        return {}
+    return {"$and": [{"name_tokens": {"$regex": f"^{term}"}} for term in terms]}
+
+async def _write_search_fields(pending: List[Tuple[str, str]]):
+    from pymongo import UpdateOne
+
+    ops = [UpdateOne({"id": student_id}, {"$set": {"name_tokens": name_tokens(name)}}) for student_id, name in pending]
+    await db.students.bulk_write(ops, ordered=False)
+
+async def ensure_search_fields():
+    """
+    Preenche `name_tokens` nos alunos gravados antes da busca no servidor
+    """
+    pending = []
+    updated = 0
+    async for student in db.students.find({"name_tokens": {"$exists": False}}, {"_id": 0, "id": 1, "name": 1}):
+        pending.append((student["id"], student.get("name") or ""))
+        if len(pending) >= 1000:
+            await _write_search_fields(pending)
+            updated += len(pending)
+            pending = []
+    if pending:
+        await _write_search_fields(pending)
+        updated += len(pending)
+    if updated:
+        logger.info(f"Campo de busca preenchido em {updated} alunos")
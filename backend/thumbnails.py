@@ -0,0 +1,57 @@
+from typing import Dict
+import asyncio
+import io
+import os
+
+PHOTO_SIZES = (64, 160, 512)
+VARIANT_CONTENT_TYPE = "image/jpeg"
+JPEG_QUALITY = 85
+
+THUMBNAIL_WORKERS = int(os.environ.get("THUMBNAIL_WORKERS", min(2, os.cpu_count() or 1)))
+
+_pool = None
+
+def render_variants(content: bytes) -> Dict[int, bytes]:
+    """
+    Decodifica a imagem uma única vez e gera as variantes JPEG de cada tamanho.
+    Executa no pool de processos; levanta ValueError se a imagem for inválida.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode != "RGB":
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                rgba = image.convert("RGBA")
+                background.paste(rgba, mask=rgba.getchannel("A"))
+                image = background
+
+            variants = {}
+            # Do maior para o menor, reaproveitando a redução anterior
+            for size in sorted(PHOTO_SIZES, reverse=True):
+                image.thumbnail((size, size), Image.LANCZOS)
+                buffer = io.BytesIO()
+                image.save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                variants[size] = buffer.getvalue()
+            return variants
+    except Exception as e:
+        raise ValueError(f"Imagem inválida: {e}") from None
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        _pool = ProcessPoolExecutor(max_workers=THUMBNAIL_WORKERS)
+    return _pool
+
+async def generate_variants(content: bytes) -> Dict[int, bytes]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), render_variants, content)
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -13,6 +13,10 @@ let isDev = process.env.ELECTRON_DEV === 'true';
 const BACKEND_PORT = 8001;
 const FRONTEND_PORT = 3000;
 
+// Linha que o backend imprime no stdout ao terminar a inicialização (server.py)
+const BACKEND_READY_MESSAGE = 'SGE_BACKEND_READY';
+const BACKEND_START_TIMEOUT = 45000;
+
 // Caminho base para recursos
 function getResourcePath() {
   if (isDev) {
@@ -64,7 +68,7 @@ async function waitForBackend(maxAttempts = 45, interval = 1000) {
   return false;
 }
 
-// Iniciar o backend Python
+// Iniciar o backend Python e aguardar o sinal de pronto no stdout
 function startBackend() {
   return new Promise((resolve, reject) => {
     if (isDev) {
@@ -78,8 +82,11 @@ function startBackend() {
     console.log(`🚀 Iniciando backend em: ${backendPath}`);
 
     // Variáveis de ambiente para o backend
+    // O banco continua sendo o MongoDB; com DB_BACKEND=sqlite (no ambiente ou em
+    // backend/.env) o backend usa o banco embutido na pasta de dados do usuário
     const env = {
       ...process.env,
+      SQLITE_PATH: process.env.SQLITE_PATH || path.join(app.getPath('userData'), 'sge.db'),
       MONGO_URL: process.env.MONGO_URL || 'mongodb://localhost:27017',
       DB_NAME: process.env.DB_NAME || 'sge_database',
       JWT_SECRET_KEY: process.env.JWT_SECRET_KEY || 'sge-desktop-secret-key-2024',
@@ -89,6 +96,22 @@ function startBackend() {
     // Usar Python do sistema
     let pythonExecutable = process.platform === 'win32' ? 'python' : 'python3';
 
+    const spawnedAt = Date.now();
+    let settled = false;
+    const finish = (ready) => {
+      if (settled) return;
+      settled = true;
+      clearTimeout(startTimeout);
+      if (ready) {
+        console.log(`✅ Backend pronto em ${Date.now() - spawnedAt} ms`);
+      }
+      resolve(ready);
+    };
+    const startTimeout = setTimeout(() => {
+      console.error('❌ Timeout aguardando o backend sinalizar que está pronto');
+      finish(false);
+    }, BACKEND_START_TIMEOUT);
+
     backendProcess = spawn(pythonExecutable, [
       '-m', 'uvicorn',
       'server:app',
@@ -103,6 +126,9 @@ function startBackend() {
 
     backendProcess.stdout.on('data', (data) => {
       console.log(`[Backend] ${data}`);
+      if (data.toString().includes(BACKEND_READY_MESSAGE)) {
+        finish(true);
+      }
     });
 
     backendProcess.stderr.on('data', (data) => {
@@ -111,15 +137,16 @@ function startBackend() {
 
     backendProcess.on('error', (err) => {
       console.error('Erro ao iniciar backend:', err);
+      settled = true;
+      clearTimeout(startTimeout);
       reject(err);
     });
 
     backendProcess.on('exit', (code) => {
       console.log(`Backend encerrado com código: ${code}`);
       backendProcess = null;
+      finish(false);
     });
-
-    setTimeout(() => resolve(true), 2000);
   });
 }
 
@@ -252,11 +279,10 @@ app.whenReady().then(async () => {
       console.log('🔧 Modo dev: pulando verificação do backend local');
       console.log('📡 O frontend usará a API configurada em api.js');
     } else {
-      // Modo produção: iniciar e aguardar backend
-      await startBackend();
-
-      // Aguardar backend estar pronto
-      let backendReady = await waitForBackend();
+      // Modo produção: iniciar o backend e aguardar o sinal de pronto.
+      // O sinal sai logo antes do uvicorn abrir a porta, então o health check
+      // só confirma a conexão com tentativas curtas.
+      let backendReady = await startBackend() && await waitForBackend(40, 50);
       
       // Se não conectou, mostrar erro e permitir tentar novamente
       while (!backendReady) {
@@ -269,8 +295,7 @@ app.whenReady().then(async () => {
         }
         
         // Tentar iniciar novamente
-        await startBackend();
-        backendReady = await waitForBackend();
+        backendReady = await startBackend() && await waitForBackend(40, 50);
       }
     }
 
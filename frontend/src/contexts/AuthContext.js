@@ -1,5 +1,5 @@
 import React, { createContext, useState, useContext, useEffect } from 'react';
-import api from '@/utils/api';
+import api, { refreshMediaToken, clearMediaToken } from '@/utils/api';
 
 const AuthContext = createContext(null);
 
@@ -18,7 +18,7 @@ export const AuthProvider = ({ children }) => {
 
   const fetchCurrentUser = async () => {
     try {
-      const response = await api.get('/auth/me');
+      const [response] = await Promise.all([api.get('/auth/me'), refreshMediaToken()]);
       setUser(response.data);
     } catch (error) {
       console.error('Erro ao buscar usuário:', error);
@@ -33,6 +33,7 @@ export const AuthProvider = ({ children }) => {
       const response = await api.post('/auth/login', { email, password });
       const { access_token, user } = response.data;
       localStorage.setItem('token', access_token);
+      await refreshMediaToken();
       setToken(access_token);
       setUser(user);
       return { success: true };
@@ -46,6 +47,7 @@ export const AuthProvider = ({ children }) => {
 
   const logout = () => {
     localStorage.removeItem('token');
+    clearMediaToken();
     setToken(null);
     setUser(null);
   };
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import api from '@/utils/api';
+import api, { studentPhotoUrl } from '@/utils/api';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Users, GraduationCap, BookOpen, UsersRound, TrendingUp } from 'lucide-react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
@@ -124,9 +124,9 @@ const DashboardPage = () => {
                   className="flex items-center gap-4 p-4 rounded-lg border border-border hover:bg-accent transition-colors"
                   data-testid={`recent-student-${student.id}`}
                 >
-                  {student.photo ? (
+                  {student.photo_id ? (
                     <img
-                      src={student.photo}
+                      src={studentPhotoUrl(student, 64)}
                       alt={student.name}
                       className="h-12 w-12 rounded-full object-cover"
                     />
@@ -1,12 +1,11 @@
 import React, { useEffect, useState } from 'react';
-import api from '@/utils/api';
+import api, { fetchAllPages, studentPhotoUrl } from '@/utils/api';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent } from '@/components/ui/card';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { Label } from '@/components/ui/label';
 import { toast } from 'sonner';
 import { ImageIcon, Users, Download, FileDown, Loader2, FolderOpen } from 'lucide-react';
-import jsPDF from 'jspdf';
 
 // Detectar se está no Electron
 const isElectron = () => {
@@ -32,13 +31,13 @@ const PhotoGridPage = () => {
 
   const fetchData = async () => {
     try {
-      const [studentsRes, turmasRes] = await Promise.all([
-        api.get('/students'),
+      const [studentItems, turmasRes] = await Promise.all([
+        fetchAllPages('/students'),
         api.get('/turmas')
       ]);
-      setStudents(studentsRes.data);
+      setStudents(studentItems);
       setTurmas(turmasRes.data);
-      setFilteredStudents(studentsRes.data);
+      setFilteredStudents(studentItems);
     } catch (error) {
       toast.error('Erro ao carregar dados');
     } finally {
@@ -64,98 +63,23 @@ const PhotoGridPage = () => {
     return acc;
   }, {});
 
-  // Função para gerar o PDF
-  const generatePDF = (turmaData) => {
-    const pdf = new jsPDF('p', 'mm', 'a4');
-    const pageWidth = pdf.internal.pageSize.getWidth();
-    const pageHeight = pdf.internal.pageSize.getHeight();
-    const margin = 15;
-    const photoSize = 35;
-    const photoGap = 8;
-    const textHeight = 12;
-    const itemHeight = photoSize + textHeight + 5;
-    const cols = Math.floor((pageWidth - 2 * margin) / (photoSize + photoGap));
-    
-    let currentX = margin;
-    let currentY = margin + 20;
-    let col = 0;
-
-    // Título
-    pdf.setFontSize(20);
-    pdf.setFont('helvetica', 'bold');
-    pdf.text(turmaData.name, pageWidth / 2, margin + 5, { align: 'center' });
-    
-    pdf.setFontSize(10);
-    pdf.setFont('helvetica', 'normal');
-    pdf.text(`Total de alunos: ${turmaData.students.length}`, pageWidth / 2, margin + 12, { align: 'center' });
-
-    // Data de geração
-    const dataGeracao = new Date().toLocaleDateString('pt-BR');
-    pdf.setFontSize(8);
-    pdf.text(`Gerado em: ${dataGeracao}`, pageWidth - margin, pageHeight - 10, { align: 'right' });
-
-    // Processar cada aluno
-    for (let i = 0; i < turmaData.students.length; i++) {
-      const student = turmaData.students[i];
-      
-      // Verificar se precisa de nova página
-      if (currentY + itemHeight > pageHeight - margin) {
-        pdf.addPage();
-        currentY = margin + 10;
-        col = 0;
-        currentX = margin;
-      }
-
-      // Desenhar quadro para foto
-      pdf.setDrawColor(200, 200, 200);
-      pdf.setFillColor(245, 245, 245);
-      pdf.roundedRect(currentX, currentY, photoSize, photoSize, 3, 3, 'FD');
-
-      // Tentar adicionar foto
-      if (student.photo) {
-        try {
-          if (student.photo.startsWith('data:image')) {
-            pdf.addImage(student.photo, 'JPEG', currentX + 2, currentY + 2, photoSize - 4, photoSize - 4);
-          }
-        } catch (e) {
-          // Se falhar, mostrar inicial
-          pdf.setFontSize(24);
-          pdf.setFont('helvetica', 'bold');
-          pdf.setTextColor(100, 100, 100);
-          pdf.text(student.name.charAt(0).toUpperCase(), currentX + photoSize / 2, currentY + photoSize / 2 + 5, { align: 'center' });
-          pdf.setTextColor(0, 0, 0);
-        }
-      } else {
-        // Mostrar inicial se não tem foto
-        pdf.setFontSize(24);
-        pdf.setFont('helvetica', 'bold');
-        pdf.setTextColor(100, 100, 100);
-        pdf.text(student.name.charAt(0).toUpperCase(), currentX + photoSize / 2, currentY + photoSize / 2 + 5, { align: 'center' });
-        pdf.setTextColor(0, 0, 0);
-      }
-
-      // Nome do aluno
-      pdf.setFontSize(8);
-      pdf.setFont('helvetica', 'normal');
-      const truncatedName = student.name.length > 18 ? student.name.substring(0, 16) + '...' : student.name;
-      pdf.text(truncatedName, currentX + photoSize / 2, currentY + photoSize + 6, { align: 'center', maxWidth: photoSize });
-
-      // Próxima posição
-      col++;
-      if (col >= cols) {
-        col = 0;
-        currentX = margin;
-        currentY += itemHeight;
-      } else {
-        currentX += photoSize + photoGap;
-      }
-    }
-
-    return pdf;
+  // Baixa o PDF gerado pelo backend (a renderização não trava mais a janela)
+  const downloadPDF = async (url) => {
+    const response = await api.get(url, { responseType: 'arraybuffer' });
+    return response.data;
   };
 
   // Função para salvar PDF com diálogo (Electron) ou download direto (Web)
-  const savePDF = async (pdf, defaultFileName) => {
+  const savePDF = async (pdfData, defaultFileName) => {
+    const downloadBlob = () => {
+      const blobUrl = URL.createObjectURL(new Blob([pdfData], { type: 'application/pdf' }));
+      const link = document.createElement('a');
+      link.href = blobUrl;
+      link.download = defaultFileName;
+      link.click();
+      URL.revokeObjectURL(blobUrl);
+    };
+
     if (isElectron() && window.electronAPI?.showSaveDialog) {
       try {
         // Mostrar diálogo de "Salvar Como"
@@ -171,11 +95,8 @@ const PhotoGridPage = () => {
           return { success: false, canceled: true };
         }
 
-        // Gerar o PDF como ArrayBuffer
-        const pdfOutput = pdf.output('arraybuffer');
-        
         // Salvar usando o Electron
-        const saveResult = await window.electronAPI.saveFile(result.filePath, pdfOutput);
+        const saveResult = await window.electronAPI.saveFile(result.filePath, pdfData);
         
         if (saveResult.success) {
           return { success: true, path: saveResult.path };
@@ -185,26 +106,25 @@ const PhotoGridPage = () => {
       } catch (error) {
         console.error('Erro ao salvar PDF:', error);
         // Fallback para download padrão
-        pdf.save(defaultFileName);
+        downloadBlob();
         return { success: true, fallback: true };
       }
     } else {
       // Modo web: download direto
-      pdf.save(defaultFileName);
+      downloadBlob();
       return { success: true };
     }
   };
 
-  // Função para exportar PDF de uma turma
-  const exportTurmaToPDF = async (turmaId, turmaData) => {
+  const pdfFileName = (name) => `${name.replace(/[^a-zA-Z0-9\s]/g, '').replace(/\s+/g, '_')}.pdf`;
+
+  const exportPDF = async (url, fileName, turmaId) => {
     setExportingTurma(turmaId);
     setExporting(true);
 
     try {
-      const pdf = generatePDF(turmaData);
-      const fileName = `${turmaData.name.replace(/[^a-zA-Z0-9\s]/g, '').replace(/\s+/g, '_')}.pdf`;
-      
-      const result = await savePDF(pdf, fileName);
+      const pdfData = await downloadPDF(url);
+      const result = await savePDF(pdfData, fileName);
       
       if (result.canceled) {
         toast.info('Exportação cancelada');
@@ -224,43 +144,16 @@ const PhotoGridPage = () => {
     }
   };
 
-  // Função para exportar todas as turmas
-  const exportAllToPDF = async () => {
-    setExporting(true);
-    
-    try {
-      let savedCount = 0;
-      
-      for (const [turmaId, turmaData] of Object.entries(groupedByTurma)) {
-        setExportingTurma(turmaId);
-        
-        const pdf = generatePDF(turmaData);
-        const fileName = `${turmaData.name.replace(/[^a-zA-Z0-9\s]/g, '').replace(/\s+/g, '_')}.pdf`;
-        
-        const result = await savePDF(pdf, fileName);
-        
-        if (result.canceled) {
-          toast.info('Exportação cancelada');
-          break;
-        }
-        
-        if (result.success) {
-          savedCount++;
-        }
-        
-        // Pequena pausa entre downloads
-        await new Promise(resolve => setTimeout(resolve, 300));
-      }
-      
-      if (savedCount > 0) {
-        toast.success(`${savedCount} PDF(s) gerado(s) com sucesso!`);
-      }
-    } catch (error) {
-      toast.error('Erro ao gerar PDFs');
-    } finally {
-      setExporting(false);
-      setExportingTurma(null);
+  // Função para exportar PDF de uma turma
+  const exportTurmaToPDF = (turmaId, turmaData) =>
+    exportPDF(`/turmas/${turmaId}/photo-grid.pdf`, pdfFileName(turmaData.name), turmaId);
+
+  // Função para exportar todas as turmas (um único PDF, uma seção por turma)
+  const exportAllToPDF = () => {
+    if (selectedTurma !== 'all') {
+      return exportTurmaToPDF(selectedTurma, groupedByTurma[selectedTurma]);
     }
+    return exportPDF('/turmas/photo-grid.pdf', 'Todas_as_Turmas.pdf', null);
   };
 
   if (loading) {
@@ -286,7 +179,7 @@ const PhotoGridPage = () => {
             {exporting ? (
               <>
                 <Loader2 className="h-4 w-4 animate-spin" />
-                Gerando PDFs...
+                Gerando PDF...
               </>
             ) : (
               <>
@@ -369,9 +262,9 @@ const PhotoGridPage = () => {
                 >
                   <CardContent className="p-0">
                     <div className="aspect-[3/4] bg-muted relative overflow-hidden">
-                      {student.photo ? (
+                      {student.photo_id ? (
                         <img
-                          src={student.photo}
+                          src={studentPhotoUrl(student, 512)}
                           alt={student.name}
                           className="w-full h-full object-cover"
                         />
@@ -1,5 +1,5 @@
-import React, { useEffect, useState, useMemo } from 'react';
-import api from '@/utils/api';
+import React, { useEffect, useState, useRef } from 'react';
+import api, { studentPhotoUrl } from '@/utils/api';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -7,22 +7,27 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { toast } from 'sonner';
-import { Plus, Search, Edit, Trash2 } from 'lucide-react';
-import Pagination from '@/components/Pagination';
+import { Plus, Search, Edit, Trash2, Upload, Download } from 'lucide-react';
+import CursorPagination from '@/components/CursorPagination';
 
 const StudentsPage = () => {
   const [students, setStudents] = useState([]);
   const [turmas, setTurmas] = useState([]);
   const [searchTerm, setSearchTerm] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
   const [statusFilter, setStatusFilter] = useState('all');
   const [turmaFilter, setTurmaFilter] = useState('all');
   const [dialogOpen, setDialogOpen] = useState(false);
   const [editingStudent, setEditingStudent] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [importing, setImporting] = useState(false);
+  const importInputRef = useRef(null);
 
-  // Paginação
+  // Paginação por cursor: pageCursors[n] é o cursor que abre a página n + 1
   const [currentPage, setCurrentPage] = useState(1);
   const [itemsPerPage, setItemsPerPage] = useState(10);
+  const [pageCursors, setPageCursors] = useState([null]);
+  const [totalItems, setTotalItems] = useState(0);
 
   const [formData, setFormData] = useState({
     name: '',
@@ -34,19 +39,45 @@ const StudentsPage = () => {
   });
 
   useEffect(() => {
-    fetchStudents();
     fetchTurmas();
   }, []);
 
-  // Reset para página 1 quando filtros mudam
+  // Espera o usuário parar de digitar antes de consultar o servidor
   useEffect(() => {
+    const timeout = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timeout);
+  }, [searchTerm]);
+
+  // Volta para a página 1 quando filtros mudam
+  useEffect(() => {
+    setPageCursors([null]);
     setCurrentPage(1);
-  }, [searchTerm, statusFilter, turmaFilter]);
+    fetchStudents(1, null);
+  }, [debouncedSearch, statusFilter, turmaFilter, itemsPerPage]);
+
+  const filterParams = () => {
+    const params = {};
+    if (debouncedSearch) params.q = debouncedSearch;
+    if (statusFilter !== 'all') params.status = statusFilter;
+    if (turmaFilter !== 'all') params.turma_id = turmaFilter;
+    return params;
+  };
 
-  const fetchStudents = async () => {
+  // O total custa uma contagem no servidor: é pedido ao mudar os filtros ou os dados,
+  // e reaproveitado na troca de página
+  const fetchStudents = async (page = currentPage, cursor = pageCursors[currentPage - 1], withTotal = true) => {
     try {
-      const response = await api.get('/students');
-      setStudents(response.data);
+      const params = { ...filterParams(), limit: itemsPerPage };
+      if (cursor) params.cursor = cursor;
+      if (withTotal) params.with_total = true;
+      const { data } = await api.get('/students', { params });
+      setStudents(data.items);
+      if (withTotal) setTotalItems(data.total);
+      setPageCursors(prev => {
+        const cursors = prev.slice(0, page);
+        if (data.next_cursor) cursors[page] = data.next_cursor;
+        return cursors;
+      });
     } catch (error) {
       toast.error('Erro ao carregar alunos');
     } finally {
@@ -63,35 +94,6 @@ const StudentsPage = () => {
     }
   };
 
-  // Filtrar alunos
-  const filteredStudents = useMemo(() => {
-    let filtered = students;
-
-    if (searchTerm) {
-      filtered = filtered.filter(student =>
-        student.name.toLowerCase().includes(searchTerm.toLowerCase())
-      );
-    }
-
-    if (statusFilter !== 'all') {
-      filtered = filtered.filter(student => student.status === statusFilter);
-    }
-
-    if (turmaFilter !== 'all') {
-      filtered = filtered.filter(student => student.turma_id === turmaFilter);
-    }
-
-    return filtered;
-  }, [students, searchTerm, statusFilter, turmaFilter]);
-
-  // Dados paginados
-  const paginatedStudents = useMemo(() => {
-    const startIndex = (currentPage - 1) * itemsPerPage;
-    return filteredStudents.slice(startIndex, startIndex + itemsPerPage);
-  }, [filteredStudents, currentPage, itemsPerPage]);
-
-  const totalPages = Math.ceil(filteredStudents.length / itemsPerPage);
-
   const handlePhotoUpload = (e) => {
     const file = e.target.files[0];
     if (file) {
@@ -106,12 +108,16 @@ const StudentsPage = () => {
   const handleSubmit = async (e) => {
     e.preventDefault();
 
+    // A foto só é enviada quando o usuário escolhe um novo arquivo
+    const payload = { ...formData };
+    if (!payload.photo) delete payload.photo;
+
     try {
       if (editingStudent) {
-        await api.put(`/students/${editingStudent.id}`, formData);
+        await api.put(`/students/${editingStudent.id}`, payload);
         toast.success('Aluno atualizado com sucesso!');
       } else {
-        await api.post('/students', formData);
+        await api.post('/students', payload);
         toast.success('Aluno cadastrado com sucesso!');
       }
       
@@ -123,6 +129,46 @@ const StudentsPage = () => {
     }
   };
 
+  const handleImport = async (e) => {
+    const file = e.target.files[0];
+    e.target.value = '';
+    if (!file) return;
+
+    setImporting(true);
+    try {
+      const body = new FormData();
+      body.append('file', file);
+      const { data } = await api.post('/students/import', body, {
+        headers: { 'Content-Type': 'multipart/form-data' }
+      });
+      toast.success(`${data.imported} de ${data.total_rows} alunos importados`);
+      if (data.errors.length > 0) {
+        const preview = data.errors.slice(0, 3).map(err => `Linha ${err.row}: ${err.errors.join(', ')}`).join('\n');
+        toast.error(`${data.errors.length} linha(s) com erro\n${preview}`);
+      }
+      fetchStudents();
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Erro ao importar planilha');
+    } finally {
+      setImporting(false);
+    }
+  };
+
+  const handleExport = async (format) => {
+    try {
+      const params = { ...filterParams(), format };
+      const response = await api.get('/students/export', { params, responseType: 'blob' });
+      const blobUrl = URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = blobUrl;
+      link.download = `alunos.${format}`;
+      link.click();
+      URL.revokeObjectURL(blobUrl);
+    } catch (error) {
+      toast.error('Erro ao exportar alunos');
+    }
+  };
+
   const handleEdit = (student) => {
     setEditingStudent(student);
     setFormData({
@@ -131,7 +177,7 @@ const StudentsPage = () => {
       phone: student.phone || '',
       birth_date: student.birth_date || '',
       turma_id: student.turma_id,
-      photo: student.photo || ''
+      photo: ''
     });
     setDialogOpen(true);
   };
@@ -162,11 +208,11 @@ const StudentsPage = () => {
 
   const handlePageChange = (page) => {
     setCurrentPage(page);
+    fetchStudents(page, pageCursors[page - 1], false);
   };
 
   const handleItemsPerPageChange = (items) => {
     setItemsPerPage(items);
-    setCurrentPage(1);
   };
 
   if (loading) {
@@ -180,121 +226,148 @@ const StudentsPage = () => {
           <h1 className="text-4xl font-heading font-bold text-primary">Alunos</h1>
           <p className="text-muted-foreground mt-2">Gerencie os alunos da instituição</p>
         </div>
-        <Dialog open={dialogOpen} onOpenChange={(open) => {
-          setDialogOpen(open);
-          if (!open) resetForm();
-        }}>
-          <DialogTrigger asChild>
-            <Button data-testid="add-student-button">
-              <Plus className="h-4 w-4 mr-2" />
-              Novo Aluno
-            </Button>
-          </DialogTrigger>
-          <DialogContent className="max-w-2xl max-h-[90vh] overflow-y-auto">
-            <DialogHeader>
-              <DialogTitle>{editingStudent ? 'Editar Aluno' : 'Novo Aluno'}</DialogTitle>
-            </DialogHeader>
-            <form onSubmit={handleSubmit} className="space-y-4" data-testid="student-form">
-              <div className="space-y-2">
-                <Label htmlFor="photo">Foto</Label>
-                <div className="flex items-center gap-4">
-                  {formData.photo && (
-                    <img
-                      src={formData.photo}
-                      alt="Preview"
-                      className="h-24 w-24 rounded-lg object-cover"
-                    />
-                  )}
-                  <div className="flex-1">
-                    <Input
-                      id="photo"
-                      type="file"
-                      accept="image/*"
-                      onChange={handlePhotoUpload}
-                      data-testid="photo-input"
-                    />
+        <div className="flex gap-2">
+          <input
+            ref={importInputRef}
+            type="file"
+            accept=".csv,.xlsx"
+            className="hidden"
+            onChange={handleImport}
+            data-testid="import-input"
+          />
+          <Button
+            variant="outline"
+            onClick={() => handleExport('xlsx')}
+            data-testid="export-students-button"
+          >
+            <Download className="h-4 w-4 mr-2" />
+            Exportar
+          </Button>
+          <Button
+            variant="outline"
+            onClick={() => importInputRef.current?.click()}
+            disabled={importing}
+            data-testid="import-students-button"
+          >
+            <Upload className="h-4 w-4 mr-2" />
+            {importing ? 'Importando...' : 'Importar Planilha'}
+          </Button>
+          <Dialog open={dialogOpen} onOpenChange={(open) => {
+            setDialogOpen(open);
+            if (!open) resetForm();
+          }}>
+            <DialogTrigger asChild>
+              <Button data-testid="add-student-button">
+                <Plus className="h-4 w-4 mr-2" />
+                Novo Aluno
+              </Button>
+            </DialogTrigger>
+            <DialogContent className="max-w-2xl max-h-[90vh] overflow-y-auto">
+              <DialogHeader>
+                <DialogTitle>{editingStudent ? 'Editar Aluno' : 'Novo Aluno'}</DialogTitle>
+              </DialogHeader>
+              <form onSubmit={handleSubmit} className="space-y-4" data-testid="student-form">
+                <div className="space-y-2">
+                  <Label htmlFor="photo">Foto</Label>
+                  <div className="flex items-center gap-4">
+                    {(formData.photo || editingStudent?.photo_id) && (
+                      <img
+                        src={formData.photo || studentPhotoUrl(editingStudent, 160)}
+                        alt="Preview"
+                        className="h-24 w-24 rounded-lg object-cover"
+                      />
+                    )}
+                    <div className="flex-1">
+                      <Input
+                        id="photo"
+                        type="file"
+                        accept="image/*"
+                        onChange={handlePhotoUpload}
+                        data-testid="photo-input"
+                      />
+                    </div>
                   </div>
                 </div>
-              </div>
 
-              <div className="space-y-2">
-                <Label htmlFor="name">Nome Completo *</Label>
-                <Input
-                  id="name"
-                  value={formData.name}
-                  onChange={(e) => setFormData({ ...formData, name: e.target.value })}
-                  required
-                  data-testid="name-input"
-                />
-              </div>
-
-              <div className="grid grid-cols-2 gap-4">
                 <div className="space-y-2">
-                  <Label htmlFor="email">Email</Label>
+                  <Label htmlFor="name">Nome Completo *</Label>
                   <Input
-                    id="email"
-                    type="email"
-                    value={formData.email}
-                    onChange={(e) => setFormData({ ...formData, email: e.target.value })}
-                    data-testid="email-input"
+                    id="name"
+                    value={formData.name}
+                    onChange={(e) => setFormData({ ...formData, name: e.target.value })}
+                    required
+                    data-testid="name-input"
                   />
                 </div>
 
-                <div className="space-y-2">
-                  <Label htmlFor="phone">Telefone</Label>
-                  <Input
-                    id="phone"
-                    value={formData.phone}
-                    onChange={(e) => setFormData({ ...formData, phone: e.target.value })}
-                    data-testid="phone-input"
-                  />
-                </div>
-              </div>
+                <div className="grid grid-cols-2 gap-4">
+                  <div className="space-y-2">
+                    <Label htmlFor="email">Email</Label>
+                    <Input
+                      id="email"
+                      type="email"
+                      value={formData.email}
+                      onChange={(e) => setFormData({ ...formData, email: e.target.value })}
+                      data-testid="email-input"
+                    />
+                  </div>
 
-              <div className="grid grid-cols-2 gap-4">
-                <div className="space-y-2">
-                  <Label htmlFor="birth_date">Data de Nascimento</Label>
-                  <Input
-                    id="birth_date"
-                    type="date"
-                    value={formData.birth_date}
-                    onChange={(e) => setFormData({ ...formData, birth_date: e.target.value })}
-                    data-testid="birth-date-input"
-                  />
+                  <div className="space-y-2">
+                    <Label htmlFor="phone">Telefone</Label>
+                    <Input
+                      id="phone"
+                      value={formData.phone}
+                      onChange={(e) => setFormData({ ...formData, phone: e.target.value })}
+                      data-testid="phone-input"
+                    />
+                  </div>
                 </div>
 
-                <div className="space-y-2">
-                  <Label htmlFor="turma_id">Turma *</Label>
-                  <Select
-                    value={formData.turma_id}
-                    onValueChange={(value) => setFormData({ ...formData, turma_id: value })}
-                    required
-                  >
-                    <SelectTrigger data-testid="turma-select">
-                      <SelectValue placeholder="Selecione a turma" />
-                    </SelectTrigger>
-                    <SelectContent>
-                      {turmas.map((turma) => (
-                        <SelectItem key={turma.id} value={turma.id}>
-                          {turma.name} - {turma.course_name}
-                        </SelectItem>
-                      ))}
-                    </SelectContent>
-                  </Select>
+                <div className="grid grid-cols-2 gap-4">
+                  <div className="space-y-2">
+                    <Label htmlFor="birth_date">Data de Nascimento</Label>
+                    <Input
+                      id="birth_date"
+                      type="date"
+                      value={formData.birth_date}
+                      onChange={(e) => setFormData({ ...formData, birth_date: e.target.value })}
+                      data-testid="birth-date-input"
+                    />
+                  </div>
+
+                  <div className="space-y-2">
+                    <Label htmlFor="turma_id">Turma *</Label>
+                    <Select
+                      value={formData.turma_id}
+                      onValueChange={(value) => setFormData({ ...formData, turma_id: value })}
+                      required
+                    >
+                      <SelectTrigger data-testid="turma-select">
+                        <SelectValue placeholder="Selecione a turma" />
+                      </SelectTrigger>
+                      <SelectContent>
+                        {turmas.map((turma) => (
+                          <SelectItem key={turma.id} value={turma.id}>
+                            {turma.name} - {turma.course_name}
+                          </SelectItem>
+                        ))}
+                      </SelectContent>
+                    </Select>
+                  </div>
                 </div>
-              </div>
 
-              <div className="flex gap-2 justify-end pt-4">
-                <Button type="button" variant="outline" onClick={() => setDialogOpen(false)}>
-                  Cancelar
-                </Button>
-                <Button type="submit" data-testid="submit-student-button">
-                  {editingStudent ? 'Atualizar' : 'Cadastrar'}
-                </Button>
-              </div>
-            </form>
-          </DialogContent>
-        </Dialog>
+                <div className="flex gap-2 justify-end pt-4">
+                  <Button type="button" variant="outline" onClick={() => setDialogOpen(false)}>
+                    Cancelar
+                  </Button>
+                  <Button type="submit" data-testid="submit-student-button">
+                    {editingStudent ? 'Atualizar' : 'Cadastrar'}
+                  </Button>
+                </div>
+              </form>
+            </DialogContent>
+          </Dialog>
+        </div>
       </div>
 
       <Card>
@@ -367,19 +440,19 @@ const StudentsPage = () => {
                 </tr>
               </thead>
               <tbody className="divide-y divide-border">
-                {paginatedStudents.length === 0 ? (
+                {students.length === 0 ? (
                   <tr>
                     <td colSpan="6" className="px-6 py-12 text-center text-muted-foreground">
                       Nenhum aluno encontrado
                     </td>
                   </tr>
                 ) : (
-                  paginatedStudents.map((student) => (
+                  students.map((student) => (
                     <tr key={student.id} className="hover:bg-accent" data-testid={`student-row-${student.id}`}>
                       <td className="px-6 py-4">
-                        {student.photo ? (
+                        {student.photo_id ? (
                           <img
-                            src={student.photo}
+                            src={studentPhotoUrl(student, 64)}
                             alt={student.name}
                             className="h-10 w-10 rounded-full object-cover"
                           />
@@ -439,12 +512,12 @@ const StudentsPage = () => {
           </div>
 
           {/* Paginação */}
-          {filteredStudents.length > 0 && (
+          {totalItems > 0 && (
             <div className="border-t border-border">
-              <Pagination
+              <CursorPagination
                 currentPage={currentPage}
-                totalPages={totalPages}
-                totalItems={filteredStudents.length}
+                hasNextPage={Boolean(pageCursors[currentPage])}
+                totalItems={totalItems}
                 itemsPerPage={itemsPerPage}
                 onPageChange={handlePageChange}
                 onItemsPerPageChange={handleItemsPerPageChange}
@@ -73,6 +73,41 @@ api.interceptors.response.use(
   }
 );
 
+// Token que só lê fotos; vai na URL das imagens no lugar do token da sessão.
+// É o mesmo durante toda a sessão, então as URLs (e o cache das fotos) não mudam
+let mediaToken = '';
+
+export const refreshMediaToken = async () => {
+  const { data } = await api.post('/auth/media-token');
+  mediaToken = data.access_token;
+};
+
+export const clearMediaToken = () => {
+  mediaToken = '';
+};
+
+// URL da foto do aluno; o token de mídia vai na query porque <img> não envia headers.
+// `size` escolhe uma das miniaturas geradas pelo backend (64, 160 ou 512 px)
+export const studentPhotoUrl = (student, size) => {
+  if (!student?.photo_id) return null;
+  const sizeParam = size ? `&size=${size}` : '';
+  return `${API_URL}/students/${student.id}/photo?v=${student.photo_id}${sizeParam}&token=${encodeURIComponent(mediaToken)}`;
+};
+
+// Percorre todas as páginas de um endpoint paginado por cursor
+export const fetchAllPages = async (url, params = {}) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const response = await api.get(url, {
+      params: { limit: 500, ...params, ...(cursor ? { cursor } : {}) }
+    });
+    items.push(...response.data.items);
+    cursor = response.data.next_cursor;
+  } while (cursor);
+  return items;
+};
+
 console.log('📡 API configurada:', API_URL);
 console.log('🖥️ Ambiente:', isElectron() ? 'Electron (Desktop)' : 'Web');
 